@@ -24,6 +24,7 @@ from app.models.user import User
 from app.models.wallet import Wallet
 from app.models.api_key import APIKey
 from app.models.transaction import Transaction
+from app.models.refresh_token import RefreshToken
 
 target_metadata = Base.metadata
 
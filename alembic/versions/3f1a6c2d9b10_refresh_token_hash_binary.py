@@ -0,0 +1,67 @@
+"""Store refresh token hashes as binary HMAC digests
+
+Revision ID: 3f1a6c2d9b10
+Revises:
+Create Date: 2026-10-16 09:00:00.000000
+
+"""
+from typing import Sequence, Union
+
+from alembic import op
+import sqlalchemy as sa
+
+
+# revision identifiers, used by Alembic.
+revision: str = '3f1a6c2d9b10'
+down_revision: Union[str, Sequence[str], None] = None
+branch_labels: Union[str, Sequence[str], None] = None
+depends_on: Union[str, Sequence[str], None] = None
+
+
+def upgrade() -> None:
+    """Upgrade schema."""
+    inspector = sa.inspect(op.get_bind())
+    if "refresh_tokens" not in inspector.get_table_names():
+        # Fresh database: init_db() creates the table with the current schema
+        return
+
+    columns = {column["name"]: column for column in inspector.get_columns("refresh_tokens")}
+    if not isinstance(columns["token_hash"]["type"], sa.LargeBinary):
+        # Existing rows hold bcrypt hashes, which cannot be turned into HMAC digests
+        # without the plaintext tokens. They no longer validate, so remove them;
+        # affected users sign in again.
+        op.execute("DELETE FROM refresh_tokens")
+        with op.batch_alter_table("refresh_tokens") as batch_op:
+            batch_op.alter_column(
+                "token_hash",
+                existing_type=sa.String(),
+                type_=sa.LargeBinary(32),
+                existing_nullable=False,
+                postgresql_using="token_hash::bytea",
+            )
+
+    indexes = {index["name"] for index in inspector.get_indexes("refresh_tokens")}
+    if "ix_refresh_token_hash_active" not in indexes:
+        op.create_index(
+            "ix_refresh_token_hash_active",
+            "refresh_tokens",
+            ["token_hash"],
+            unique=True,
+            postgresql_where=sa.text("revoked = false"),
+            sqlite_where=sa.text("revoked = 0"),
+        )
+
+
+def downgrade() -> None:
+    """Downgrade schema."""
+    op.drop_index("ix_refresh_token_hash_active", table_name="refresh_tokens")
+    # Digests cannot be turned back into bcrypt hashes either
+    op.execute("DELETE FROM refresh_tokens")
+    with op.batch_alter_table("refresh_tokens") as batch_op:
+        batch_op.alter_column(
+            "token_hash",
+            existing_type=sa.LargeBinary(32),
+            type_=sa.String(),
+            existing_nullable=False,
+            postgresql_using="encode(token_hash, 'hex')",
+        )
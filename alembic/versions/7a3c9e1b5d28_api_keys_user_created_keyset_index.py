@@ -0,0 +1,44 @@
+"""Add id to ix_api_keys_user_created for the (created_at, id) cursor
+
+Revision ID: 7a3c9e1b5d28
+Revises: c4e8a1d6f2b7
+Create Date: 2026-10-16 09:50:00.000000
+
+"""
+from typing import Sequence, Union
+
+from alembic import op
+import sqlalchemy as sa
+
+
+# revision identifiers, used by Alembic.
+revision: str = '7a3c9e1b5d28'
+down_revision: Union[str, Sequence[str], None] = 'c4e8a1d6f2b7'
+branch_labels: Union[str, Sequence[str], None] = None
+depends_on: Union[str, Sequence[str], None] = None
+
+
+def upgrade() -> None:
+    """Upgrade schema."""
+    inspector = sa.inspect(op.get_bind())
+    if "api_keys" not in inspector.get_table_names():
+        return
+
+    indexes = {index["name"]: index for index in inspector.get_indexes("api_keys")}
+    existing = indexes.get("ix_api_keys_user_created")
+    if existing and existing["column_names"] == ["user_id", "created_at", "id"]:
+        return
+    if existing:
+        op.drop_index("ix_api_keys_user_created", table_name="api_keys")
+
+    op.create_index(
+        "ix_api_keys_user_created",
+        "api_keys",
+        ["user_id", sa.text("created_at DESC"), sa.text("id DESC")],
+    )
+
+
+def downgrade() -> None:
+    """Downgrade schema."""
+    op.drop_index("ix_api_keys_user_created", table_name="api_keys")
+    op.create_index("ix_api_keys_user_created", "api_keys", ["user_id", sa.text("created_at DESC")])
@@ -0,0 +1,68 @@
+"""Pack API key permissions into a bitmask
+
+Revision ID: 8b2d4e7f1a35
+Revises: 3f1a6c2d9b10
+Create Date: 2026-10-16 09:10:00.000000
+
+"""
+from typing import Sequence, Union
+
+from alembic import op
+import sqlalchemy as sa
+
+
+# revision identifiers, used by Alembic.
+revision: str = '8b2d4e7f1a35'
+down_revision: Union[str, Sequence[str], None] = '3f1a6c2d9b10'
+branch_labels: Union[str, Sequence[str], None] = None
+depends_on: Union[str, Sequence[str], None] = None
+
+# Frozen copy of app.models.api_key.PERMISSION_BITS at the time of this revision
+PERMISSION_BITS = {"read": 1, "deposit": 2, "transfer": 4}
+
+api_keys = sa.table(
+    "api_keys",
+    sa.column("id"),
+    sa.column("permissions", sa.JSON),
+    sa.column("permissions_bits", sa.SmallInteger),
+)
+
+
+def upgrade() -> None:
+    """Upgrade schema."""
+    bind = op.get_bind()
+    inspector = sa.inspect(bind)
+    if "api_keys" not in inspector.get_table_names():
+        # Fresh database: init_db() creates the table with the current schema
+        return
+
+    columns = {column["name"] for column in inspector.get_columns("api_keys")}
+    if "permissions" not in columns:
+        return
+
+    if "permissions_bits" not in columns:
+        op.add_column("api_keys", sa.Column("permissions_bits", sa.SmallInteger(), nullable=True))
+
+    for key_id, permissions in bind.execute(sa.select(api_keys.c.id, api_keys.c.permissions)).all():
+        bits = 0
+        for permission in permissions or []:
+            bits |= PERMISSION_BITS.get(permission, 0)
+        bind.execute(api_keys.update().where(api_keys.c.id == key_id).values(permissions_bits=bits))
+
+    with op.batch_alter_table("api_keys") as batch_op:
+        batch_op.alter_column("permissions_bits", existing_type=sa.SmallInteger(), nullable=False)
+        batch_op.drop_column("permissions")
+
+
+def downgrade() -> None:
+    """Downgrade schema."""
+    bind = op.get_bind()
+    op.add_column("api_keys", sa.Column("permissions", sa.JSON(), nullable=True))
+
+    for key_id, bits in bind.execute(sa.select(api_keys.c.id, api_keys.c.permissions_bits)).all():
+        permissions = [name for name, bit in PERMISSION_BITS.items() if bits & bit]
+        bind.execute(api_keys.update().where(api_keys.c.id == key_id).values(permissions=permissions))
+
+    with op.batch_alter_table("api_keys") as batch_op:
+        batch_op.alter_column("permissions", existing_type=sa.JSON(), nullable=False)
+        batch_op.drop_column("permissions_bits")
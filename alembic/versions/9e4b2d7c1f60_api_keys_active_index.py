@@ -0,0 +1,40 @@
+"""Add the partial ix_api_keys_active index to existing databases
+
+Revision ID: 9e4b2d7c1f60
+Revises: 7a3c9e1b5d28
+Create Date: 2026-10-16 10:00:00.000000
+
+"""
+from typing import Sequence, Union
+
+from alembic import op
+import sqlalchemy as sa
+
+
+# revision identifiers, used by Alembic.
+revision: str = '9e4b2d7c1f60'
+down_revision: Union[str, Sequence[str], None] = '7a3c9e1b5d28'
+branch_labels: Union[str, Sequence[str], None] = None
+depends_on: Union[str, Sequence[str], None] = None
+
+
+def upgrade() -> None:
+    """Upgrade schema."""
+    inspector = sa.inspect(op.get_bind())
+    if "api_keys" not in inspector.get_table_names():
+        return
+
+    # init_db() only creates indexes along with their table
+    if "ix_api_keys_active" not in {index["name"] for index in inspector.get_indexes("api_keys")}:
+        op.create_index(
+            "ix_api_keys_active",
+            "api_keys",
+            ["user_id"],
+            postgresql_where=sa.text("revoked = false"),
+            sqlite_where=sa.text("revoked = 0"),
+        )
+
+
+def downgrade() -> None:
+    """Downgrade schema."""
+    op.drop_index("ix_api_keys_active", table_name="api_keys")
@@ -0,0 +1,48 @@
+"""Revoke API keys still stored as bcrypt hashes
+
+Revision ID: b7f3a9c2e4d1
+Revises: 9e4b2d7c1f60
+Create Date: 2026-10-16 10:10:00.000000
+
+"""
+from typing import Sequence, Union
+
+from alembic import op
+import sqlalchemy as sa
+
+
+# revision identifiers, used by Alembic.
+revision: str = 'b7f3a9c2e4d1'
+down_revision: Union[str, Sequence[str], None] = '9e4b2d7c1f60'
+branch_labels: Union[str, Sequence[str], None] = None
+depends_on: Union[str, Sequence[str], None] = None
+
+api_keys = sa.table(
+    "api_keys",
+    sa.column("key_hash", sa.String),
+    sa.column("revoked", sa.Boolean),
+)
+
+
+def upgrade() -> None:
+    """Upgrade schema."""
+    inspector = sa.inspect(op.get_bind())
+    if "api_keys" not in inspector.get_table_names():
+        return
+
+    # Keys are now looked up by HMAC digest; bcrypt hashes ("$2b$...") cannot be
+    # converted without the plaintext keys, so they can never validate again.
+    # Revoking them frees their slots in the active-key limit and shows them as
+    # invalid in the key listing; owners create replacements.
+    op.execute(
+        api_keys.update()
+        .where(api_keys.c.key_hash.like("$2%"))
+        .where(api_keys.c.revoked == sa.false())
+        .values(revoked=True)
+    )
+
+
+def downgrade() -> None:
+    """Downgrade schema."""
+    # Revocation is not undone: the keys were already unusable, and the rows no
+    # longer record which were revoked by their owners
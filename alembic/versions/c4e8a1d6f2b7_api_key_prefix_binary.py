@@ -0,0 +1,92 @@
+"""Store API key prefixes as raw bytes and drop their index
+
+Revision ID: c4e8a1d6f2b7
+Revises: 8b2d4e7f1a35
+Create Date: 2026-10-16 09:20:00.000000
+
+"""
+import base64
+from typing import Sequence, Union
+
+from alembic import op
+import sqlalchemy as sa
+
+
+# revision identifiers, used by Alembic.
+revision: str = 'c4e8a1d6f2b7'
+down_revision: Union[str, Sequence[str], None] = '8b2d4e7f1a35'
+branch_labels: Union[str, Sequence[str], None] = None
+depends_on: Union[str, Sequence[str], None] = None
+
+api_keys = sa.table(
+    "api_keys",
+    sa.column("id"),
+    sa.column("key_prefix", sa.String),
+    sa.column("key_prefix_bin", sa.LargeBinary),
+)
+
+
+def upgrade() -> None:
+    """Upgrade schema."""
+    bind = op.get_bind()
+    inspector = sa.inspect(bind)
+    if "api_keys" not in inspector.get_table_names():
+        # Fresh database: init_db() creates the table with the current schema
+        return
+
+    # Nothing looks keys up by prefix since validation moved to key_hash
+    if "ix_api_keys_key_prefix" in {index["name"] for index in inspector.get_indexes("api_keys")}:
+        op.drop_index("ix_api_keys_key_prefix", table_name="api_keys")
+
+    columns = {column["name"]: column for column in inspector.get_columns("api_keys")}
+    if isinstance(columns["key_prefix"]["type"], sa.LargeBinary):
+        return
+
+    op.add_column("api_keys", sa.Column("key_prefix_bin", sa.LargeBinary(6), nullable=True))
+
+    # Text prefixes start with the first 8 base64url chars of the random part,
+    # which decode to the same 6 bytes extract_key_prefix() stores now
+    for key_id, key_prefix in bind.execute(sa.select(api_keys.c.id, api_keys.c.key_prefix)).all():
+        bind.execute(
+            api_keys.update()
+            .where(api_keys.c.id == key_id)
+            .values(key_prefix_bin=base64.urlsafe_b64decode(key_prefix[:8]))
+        )
+
+    with op.batch_alter_table("api_keys") as batch_op:
+        batch_op.drop_column("key_prefix")
+        batch_op.alter_column(
+            "key_prefix_bin",
+            new_column_name="key_prefix",
+            existing_type=sa.LargeBinary(6),
+            nullable=False,
+        )
+
+
+def downgrade() -> None:
+    """Downgrade schema."""
+    bind = op.get_bind()
+    op.add_column("api_keys", sa.Column("key_prefix_text", sa.String(), nullable=True))
+
+    text_keys = sa.table(
+        "api_keys",
+        sa.column("id"),
+        sa.column("key_prefix", sa.LargeBinary),
+        sa.column("key_prefix_text", sa.String),
+    )
+    for key_id, key_prefix in bind.execute(sa.select(text_keys.c.id, text_keys.c.key_prefix)).all():
+        bind.execute(
+            text_keys.update()
+            .where(text_keys.c.id == key_id)
+            .values(key_prefix_text=base64.urlsafe_b64encode(key_prefix).decode())
+        )
+
+    with op.batch_alter_table("api_keys") as batch_op:
+        batch_op.drop_column("key_prefix")
+        batch_op.alter_column(
+            "key_prefix_text",
+            new_column_name="key_prefix",
+            existing_type=sa.String(),
+            nullable=False,
+        )
+    op.create_index("ix_api_keys_key_prefix", "api_keys", ["key_prefix"])
@@ -1,16 +1,19 @@
-from datetime import timedelta
+from datetime import datetime, timedelta
+from typing import Optional
+from uuid import UUID
 from fastapi import APIRouter, Depends, status, HTTPException, Request
 from sqlalchemy.ext.asyncio import AsyncSession
 
 from app.db.session import get_db
-from app.models import User
+from app.models import User, decode_permissions
 from app.schemas.api_key import (
     APIKeyCreate, APIKeyRollover, APIKeyRevoke,
-    CreateAPIKeySuccessResponse, ListAPIKeysSuccessResponse, RevokeAPIKeySuccessResponse
+    CreateAPIKeySuccessResponse, ListAPIKeysSuccessResponse, RevokeAPIKeySuccessResponse,
+    CreateAPIKeyData
 )
 from app.services import api_key as api_key_service
 from app.api.deps import get_current_user_from_token
-from app.utils.responses import success_response, fail_response
+from app.utils.responses import success_response, encoded_success_response, dump_json, fail_response
 from app.utils.rate_limit import rate_limit
 from app.utils.logger import logger
 
@@ -45,13 +48,13 @@ async def create_api_key(
         return success_response(
             status_code=status.HTTP_201_CREATED,
             message="API key created successfully",
-            data={
-            "key_id": str(api_key.id),
-            "api_key": plain_key,
-            "expires_at": api_key.expires_at.isoformat(),
-            "name": api_key.name,
-            "permissions": api_key.permissions
-        })
+            data=CreateAPIKeyData(
+                key_id=str(api_key.id),
+                api_key=plain_key,
+                expires_at=api_key.expires_at.isoformat(),
+                name=api_key.name,
+                permissions=api_key.permissions
+            ))
     except ValueError as e:
         return fail_response(
             status_code=status.HTTP_400_BAD_REQUEST,
@@ -82,13 +85,13 @@ async def rollover_api_key(
         return success_response(
             status_code=status.HTTP_200_OK,
             message="API key rolled over successfully",
-            data={
-            "key_id": str(api_key.id),
-            "api_key": plain_key,
-            "expires_at": api_key.expires_at.isoformat(),
-            "name": api_key.name,
-            "permissions": api_key.permissions
-        })
+            data=CreateAPIKeyData(
+                key_id=str(api_key.id),
+                api_key=plain_key,
+                expires_at=api_key.expires_at.isoformat(),
+                name=api_key.name,
+                permissions=api_key.permissions
+            ))
     except ValueError as e:
         return fail_response(
             status_code=status.HTTP_404_NOT_FOUND,
@@ -96,31 +99,32 @@ async def rollover_api_key(
         )
 
 
-@router.get("", response_model=ListAPIKeysSuccessResponse)
+@router.get("", responses={200: {"model": ListAPIKeysSuccessResponse}})
 async def list_api_keys(
     limit: int = 20,
+    after: Optional[datetime] = None,
+    after_id: Optional[UUID] = None,
     current_user: User = Depends(require_jwt_auth),
     db: AsyncSession = Depends(get_db)
 ):
-    """List all API keys for authenticated user (max 20)."""
-    api_keys = await api_key_service.list_user_api_keys(db=db, user_id=str(current_user.id), limit=limit)
-    
+    """List API keys for authenticated user, newest first (max 20). Pass `after` and `after_id` = last `created_at` and `id` for the next page."""
+    rows = await api_key_service.list_user_api_keys(
+        db=db, user_id=str(current_user.id), limit=limit, after=after, after_id=after_id
+    )
     keys_data = [{
-        "id": str(key.id),
-        "name": key.name,
-        "permissions": key.permissions,
-        "created_at": key.created_at.isoformat(),
-        "expires_at": key.expires_at.isoformat(),
-        "is_valid": key.is_valid()
-    } for key in api_keys]
+        "id": row.id,
+        "name": row.name,
+        "permissions": decode_permissions(row.permissions_bits),
+        "created_at": row.created_at,
+        "expires_at": row.expires_at,
+        "is_valid": row.is_valid
+    } for row in rows]
     
-    return success_response(
+    return encoded_success_response(
         status_code=status.HTTP_200_OK,
         message=f"Retrieved {len(keys_data)} API key(s)",
-        data={
-        "keys": keys_data, 
-        "count": len(keys_data)
-    })
+        data=dump_json({"keys": keys_data, "count": len(keys_data)})
+    )
 
 
 
@@ -7,7 +7,10 @@ from urllib.parse import urlencode
 
 from app.db.session import get_db
 from app.models import User
-from app.schemas.auth import UserResponse, GoogleAuthSuccessResponse, RefreshRequest, RefreshSuccessResponse
+from app.schemas.auth import (
+    UserResponse, GoogleAuthSuccessResponse, RefreshRequest, RefreshSuccessResponse,
+    GoogleAuthData, RefreshTokenData
+)
 from app.services import auth as auth_service
 from app.api.deps import get_current_user_from_token
 from app.utils.responses import success_response, fail_response
@@ -51,7 +54,7 @@ async def google_login():
     return success_response(
         status_code=status.HTTP_200_OK,
         message="Google OAuth URL generated",
-        data={"authorization_url": authorization_url}
+        data=GoogleAuthData(authorization_url=authorization_url)
     )
 
 
@@ -87,7 +90,7 @@ async def google_callback(request: Request, db: AsyncSession = Depends(get_db)):
         )
     
     try:
-        datetime.fromisoformat(state_time_str)
+        datetime.fromisoformat(state_time_str.decode())
     except (ValueError, TypeError) as e:
         logger.error(f"Invalid state timestamp format: {e}")
         return fail_response(
@@ -159,10 +162,8 @@ async def refresh_access_token(refresh_request: RefreshRequest, db: AsyncSession
         return success_response(
             status_code=status.HTTP_200_OK,
             message="Token refreshed successfully",
-            data={
-            "access_token": new_access_token,
-            "token_type": "bearer"
-        })
+            data=RefreshTokenData(access_token=new_access_token, token_type="bearer")
+        )
     except Exception as e:
         logger.error(f"Token refresh error: {str(e)}", exc_info=True)
         return fail_response(
@@ -4,9 +4,9 @@ from fastapi.security import HTTPBearer, HTTPAuthorizationCredentials, APIKeyHea
 from sqlalchemy.ext.asyncio import AsyncSession
 from sqlalchemy import select
 from app.db.session import get_db
-from app.models import User, APIKey
+from app.models import User
 from app.services.auth import decode_access_token
-from app.services.api_key import validate_api_key
+from app.services.api_key import ValidatedAPIKey, validate_api_key
 
 
 security = HTTPBearer(auto_error=False)
@@ -51,7 +51,7 @@ async def get_current_user_from_token(
 async def get_current_user_from_api_key(
     x_api_key: Optional[str] = Depends(api_key_header),
     db: AsyncSession = Depends(get_db)
-) -> tuple[Optional[User], Optional[APIKey]]:
+) -> tuple[Optional[User], Optional[ValidatedAPIKey]]:
     """
     Get current user from API key.
     
@@ -60,7 +60,7 @@ async def get_current_user_from_api_key(
         db: Database session
         
     Returns:
-        Tuple of (User model or None, APIKey model or None)
+        Tuple of (User model or None, validated API key or None)
     """
     if not x_api_key:
         return None, None
@@ -87,7 +87,7 @@ async def get_current_user(
     
     Args:
         user_from_token: User from JWT token
-        user_and_key_from_api: Tuple of (User, APIKey) from API key
+        user_and_key_from_api: Tuple of (User, validated API key) from API key
         
     Returns:
         User model
@@ -112,16 +112,16 @@ async def get_current_user(
 async def get_current_user_with_key(
     user_from_token: Optional[User] = Depends(get_current_user_from_token),
     user_and_key_from_api: tuple = Depends(get_current_user_from_api_key),
-) -> tuple[User, Optional[APIKey]]:
+) -> tuple[User, Optional[ValidatedAPIKey]]:
     """
     Get current user and API key (if using API key auth).
     
     Args:
         user_from_token: User from JWT token
-        user_and_key_from_api: Tuple of (User, APIKey) from API key
+        user_and_key_from_api: Tuple of (User, validated API key) from API key
         
     Returns:
-        Tuple of (User model, APIKey model or None)
+        Tuple of (User model, validated API key or None)
         
     Raises:
         HTTPException: If no valid authentication provided
@@ -161,7 +161,7 @@ def require_permissions(required_permissions: List[str]):
         
         # Check API key permissions
         for permission in required_permissions:
-            if permission not in api_key.permissions:
+            if not api_key.has_permission(permission):
                 raise HTTPException(
                     status_code=status.HTTP_403_FORBIDDEN,
                     detail=f"API key missing required permission: {permission}"
@@ -1,5 +1,5 @@
 import json
-from datetime import timedelta
+from datetime import datetime, timezone, timedelta
 from fastapi import APIRouter, Depends, status, Request, HTTPException
 from sqlalchemy.ext.asyncio import AsyncSession
 
@@ -8,14 +8,17 @@ from app.models import User
 from app.schemas.wallet import (
     DepositRequest, TransferRequest,
     BalanceSuccessResponse, DepositSuccessResponse, 
-    TransferSuccessResponse, TransactionsSuccessResponse
+    TransferSuccessResponse, TransactionsSuccessResponse,
+    BalanceData, TransferData
 )
 from app.services import wallet as wallet_service
 from app.services import transaction as transaction_service
 from app.services.paystack import paystack_service
 from app.services.deposit import initialize_deposit
+from app.services.webhook import process_successful_charge, process_failed_charge
+from app.services.webhook_queue import WEBHOOK_HANDLERS, enqueue_webhook_event
 from app.api.deps import get_current_user, require_permissions
-from app.utils.responses import success_response, fail_response
+from app.utils.responses import success_response, encoded_success_response, dump_json, fail_response
 from app.utils.rate_limit import rate_limit
 from app.utils.logger import logger
 
@@ -85,21 +88,15 @@ async def get_deposit_status(
     db: AsyncSession = Depends(get_db)
 ):
     """Get deposit status (read-only, does NOT credit wallet). Requires 'read' permission."""
-    transaction = await transaction_service.get_transaction_by_reference(db, reference)
+    # Wallet is joined in so ownership is checked without a second query
+    transaction = await transaction_service.get_transaction_by_reference(db, reference, eager=True)
     if not transaction:
         return fail_response(
             status_code=status.HTTP_404_NOT_FOUND,
             message="Transaction not found"
         )
     
-    wallet = await wallet_service.get_user_wallet(db, str(current_user.id))
-    if not wallet:
-        return fail_response(
-            status_code=status.HTTP_404_NOT_FOUND,
-            message="Wallet not found"
-        )
-    
-    if transaction.wallet_id != wallet.id:
+    if transaction.wallet.user_id != current_user.id:
         return fail_response(
             status_code=status.HTTP_403_FORBIDDEN,
             message="Transaction not found or permission denied"
@@ -130,7 +127,6 @@ async def paystack_webhook(request: Request, db: AsyncSession = Depends(get_db))
     data = json.loads(body)
     
     # Timestamp validation (replay attack prevention)
-    from datetime import datetime, timezone, timedelta
     event_data = data.get("data", {})
     created_at = event_data.get("created_at") or event_data.get("createdAt")
     
@@ -149,9 +145,18 @@ async def paystack_webhook(request: Request, db: AsyncSession = Depends(get_db))
             logger.warning(f"Could not parse webhook timestamp: {created_at}", exc_info=True)
     
     event = data.get("event")
+    reference = event_data.get("reference")
+    
+    # Acknowledge Paystack right away and let the worker touch the database;
+    # events are only processed inline when the queue or its worker is unavailable
+    if event in WEBHOOK_HANDLERS and reference and await enqueue_webhook_event(event, reference):
+        return success_response(
+            status_code=status.HTTP_200_OK,
+            message="Webhook queued",
+            data={"status": True}
+        )
     
     if event == "charge.success":
-        reference = event_data.get("reference")
         if not reference:
             return fail_response(
                 status_code=status.HTTP_400_BAD_REQUEST,
@@ -159,7 +164,6 @@ async def paystack_webhook(request: Request, db: AsyncSession = Depends(get_db))
             )
         
         try:
-            from app.services.webhook import process_successful_charge
             result = await process_successful_charge(db=db, reference=reference)
             return success_response(
                 status_code=status.HTTP_200_OK,
@@ -178,7 +182,6 @@ async def paystack_webhook(request: Request, db: AsyncSession = Depends(get_db))
             )
     
     elif event == "charge.failed":
-        reference = event_data.get("reference")
         if not reference:
             return fail_response(
                 status_code=status.HTTP_400_BAD_REQUEST,
@@ -186,7 +189,6 @@ async def paystack_webhook(request: Request, db: AsyncSession = Depends(get_db))
             )
         
         try:
-            from app.services.webhook import process_failed_charge
             result = await process_failed_charge(db=db, reference=reference)
             return success_response(
                 status_code=status.HTTP_200_OK,
@@ -230,10 +232,10 @@ async def get_wallet_balance(
     return success_response(
         status_code=status.HTTP_200_OK,
         message="Balance retrieved successfully",
-        data={
-        "wallet_number": wallet.wallet_number,
-        "balance": str(wallet.balance)
-    })
+        data=BalanceData(
+            wallet_number=wallet.wallet_number,
+            balance=str(wallet.balance)
+        ))
 
 
 @router.post("/transfer", response_model=TransferSuccessResponse)
@@ -273,11 +275,11 @@ async def transfer_funds(
         return success_response(
             status_code=status.HTTP_200_OK,
             message="Transfer completed successfully",
-            data={
-            "status": "success",
-            "amount": str(transfer_data.amount),
-            "recipient_wallet": transfer_data.wallet_number
-        })
+            data=TransferData(
+                status="success",
+                amount=str(transfer_data.amount),
+                recipient_wallet=transfer_data.wallet_number
+            ))
     except ValueError as e:
         return fail_response(
             status_code=status.HTTP_400_BAD_REQUEST,
@@ -290,7 +292,7 @@ async def transfer_funds(
         )
 
 
-@router.get("/transactions", response_model=TransactionsSuccessResponse)
+@router.get("/transactions", responses={200: {"model": TransactionsSuccessResponse}})
 async def get_transaction_history(
     limit: int = 50,
     current_user: User = Depends(require_permissions(["read"])),
@@ -304,22 +306,11 @@ async def get_transaction_history(
             message="Wallet not found"
         )
     
-    transactions = await wallet_service.get_wallet_transactions(db, str(wallet.id), limit=limit)
+    rows = await wallet_service.get_wallet_transactions(db, str(wallet.id), limit=limit)
+    transactions_data = [dict(row._mapping) for row in rows]
     
-    transactions_data = [{
-        "id": str(txn.id),
-        "type": txn.type.value,
-        "amount": str(txn.amount),
-        "reference": txn.reference,
-        "status": txn.status.value,
-        "created_at": txn.created_at.isoformat()
-    } for txn in transactions]
-    
-    return success_response(
+    return encoded_success_response(
         status_code=status.HTTP_200_OK,
         message="Transaction history retrieved successfully",
-        data={
-        "transactions": transactions_data, 
-        "count": len(transactions_data)
-    })
-
+        data=dump_json({"transactions": transactions_data, "count": len(transactions_data)})
+    )
@@ -1,15 +1,19 @@
+from typing import Optional
 from pydantic_settings import BaseSettings, SettingsConfigDict
 
 
 class Settings(BaseSettings):    
     # Database
     DATABASE_URL: str
+    DB_PREPARED_STATEMENT_CACHE_SIZE: int = 500
     
     # JWT Configuration
     SECRET_KEY: str
     ALGORITHM: str = "HS256"
     ACCESS_TOKEN_EXPIRE_MINUTES: int = 30
     REFRESH_TOKEN_EXPIRE_DAYS: int = 30
+    # HMAC key for API key and refresh token hashes; falls back to SECRET_KEY
+    API_KEY_PEPPER: Optional[str] = None
     
     # Google OAuth
     GOOGLE_CLIENT_ID: str
@@ -30,6 +34,10 @@ class Settings(BaseSettings):
     # Redis Configuration
     REDIS_URL: str 
     REDIS_ENABLED: bool = True
+    # Comma-separated IPs/CIDRs that bypass rate limiting (e.g. internal callers)
+    RATE_LIMIT_EXEMPT_IPS: str = ""
+    # Webhook queue consumer name prefix, suffixed with the pid; defaults to the hostname
+    WEBHOOK_CONSUMER_NAME: Optional[str] = None
     
     model_config = SettingsConfigDict(
         env_file=".env",
@@ -0,0 +1,40 @@
+import httpx
+from typing import Optional
+from app.utils.logger import logger
+
+http_client: Optional[httpx.AsyncClient] = None
+
+
+def _create_http_client() -> httpx.AsyncClient:
+    """Create a pooled HTTP/2 client so outbound calls reuse warm TLS connections."""
+    return httpx.AsyncClient(
+        http2=True,
+        timeout=httpx.Timeout(10.0),
+        limits=httpx.Limits(max_connections=100, max_keepalive_connections=50)
+    )
+
+
+async def init_http_client():
+    """Initialize the shared HTTP client for Paystack and Google OAuth calls."""
+    global http_client
+
+    if http_client is None:
+        http_client = _create_http_client()
+        logger.info("HTTP client initialized")
+
+
+async def close_http_client():
+    """Close the shared HTTP client and its pooled connections."""
+    global http_client
+    if http_client:
+        await http_client.aclose()
+        http_client = None
+        logger.info("HTTP client closed")
+
+
+def get_http_client() -> httpx.AsyncClient:
+    """Get the shared HTTP client, creating it on first use (e.g. outside the app lifespan)."""
+    global http_client
+    if http_client is None:
+        http_client = _create_http_client()
+    return http_client
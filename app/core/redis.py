@@ -11,13 +11,14 @@ async def init_redis():
     global redis_client
     
     if not settings.REDIS_ENABLED:
-        logger.warning("Redis is disabled, rate limiting will not work")
+        logger.warning("Redis is disabled, rate limits are enforced per process")
         return
     
     try:
         redis_client = Redis.from_url(
             settings.REDIS_URL,
-            decode_responses=True,
+            # Raw bytes in and out: callers pass bytes keys and decode only what they read
+            decode_responses=False,
             max_connections=10,
             socket_connect_timeout=5
         )
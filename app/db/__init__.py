@@ -1,9 +1,6 @@
 from app.db.base import Base, BaseModel
 
-# Import all models here so Alembic can detect them
-from app.models.user import User
-from app.models.wallet import Wallet
-from app.models.api_key import APIKey
-from app.models.transaction import Transaction
+# Models are not imported here: they import app.db.base themselves, so doing it
+# from this package creates an import cycle. Alembic's env.py imports them.
 
-__all__ = ["Base", "BaseModel", "User", "Wallet", "APIKey", "Transaction"]
+__all__ = ["Base", "BaseModel"]
@@ -2,12 +2,19 @@ from sqlalchemy.ext.asyncio import create_async_engine, AsyncSession, async_sess
 from app.config import settings
 from app.db.base import Base
 
+# asyncpg already decodes results with the binary protocol; give each connection
+# a larger server-side prepared statement cache so hot queries are parsed once
+connect_args = {}
+if settings.DATABASE_URL.startswith("postgresql+asyncpg"):
+    connect_args["prepared_statement_cache_size"] = settings.DB_PREPARED_STATEMENT_CACHE_SIZE
+
 # Create async engine
 engine = create_async_engine(
     settings.DATABASE_URL,
     echo=False,
     pool_pre_ping=True,
-    future=True
+    future=True,
+    connect_args=connect_args
 )
 
 # Create async session factory
@@ -5,6 +5,9 @@ from fastapi.middleware.cors import CORSMiddleware
 from app.config import settings
 from app.db.session import init_db, engine
 from app.core.redis import init_redis, close_redis
+from app.core.http import init_http_client, close_http_client
+from app.utils.rate_limit import init_rate_limiter
+from app.services.webhook_queue import start_webhook_worker, stop_webhook_worker
 from app.api import app as api_router
 from app.middleware.correlation import CorrelationIdMiddleware
 from app.middleware.security import SecurityHeadersMiddleware
@@ -18,14 +21,19 @@ async def lifespan(app: FastAPI):
     logger.info("Starting %s v%s", settings.APP_NAME, settings.APP_VERSION)
     await init_db()
     await init_redis()
+    await init_rate_limiter()
+    await init_http_client()
+    await start_webhook_worker()
     logger.info("Database and Redis initialized successfully")
     
     yield
     
     # Shutdown
     logger.info("Shutting down %s", settings.APP_NAME)
+    await stop_webhook_worker()
     await engine.dispose()
     await close_redis()
+    await close_http_client()
     logger.info("Database and Redis connections closed")
 
 
@@ -1,10 +1,10 @@
 # Models package
 from app.models.user import User
 from app.models.wallet import Wallet
-from app.models.api_key import APIKey
+from app.models.api_key import APIKey, encode_permissions, decode_permissions
 from app.models.transaction import Transaction, TransactionType, TransactionStatus
 from app.models.refresh_token import RefreshToken
 
-__all__ = ["User", "Wallet", "APIKey", "Transaction", "TransactionType", "TransactionStatus", "RefreshToken"]
+__all__ = ["User", "Wallet", "APIKey", "encode_permissions", "decode_permissions", "Transaction", "TransactionType", "TransactionStatus", "RefreshToken"]
 
 
@@ -1,22 +1,65 @@
 import uuid
 from datetime import datetime
-from sqlalchemy import String, DateTime, Column, ForeignKey, Boolean, JSON
+from typing import Iterable
+from sqlalchemy import String, DateTime, Column, ForeignKey, Boolean, SmallInteger, LargeBinary, Index, desc, text
 from sqlalchemy.orm import relationship
 from sqlalchemy.dialects.postgresql import UUID
 from app.db.base import BaseModel
 
 
+# Permission flags packed into APIKey.permissions_bits
+PERMISSION_READ = 1
+PERMISSION_DEPOSIT = 2
+PERMISSION_TRANSFER = 4
+
+PERMISSION_BITS = {
+    "read": PERMISSION_READ,
+    "deposit": PERMISSION_DEPOSIT,
+    "transfer": PERMISSION_TRANSFER,
+}
+
+# Permission names for every possible mask, so decoding is a single dict lookup
+_PERMISSION_NAMES = {
+    bits: tuple(name for name, bit in PERMISSION_BITS.items() if bits & bit)
+    for bits in range(1 << len(PERMISSION_BITS))
+}
+
+
+def encode_permissions(permissions: Iterable[str]) -> int:
+    """Pack permission names into a bitmask."""
+    bits = 0
+    for permission in permissions:
+        bits |= PERMISSION_BITS[permission]
+    return bits
+
+
+def decode_permissions(bits: int) -> tuple[str, ...]:
+    """Expand a permission bitmask into permission names."""
+    return _PERMISSION_NAMES[bits]
+
+
 class APIKey(BaseModel):
     """API Key model for service-to-service authentication."""
     
     __tablename__ = "api_keys"
+    __table_args__ = (
+        # Active-key count at creation only needs non-revoked rows
+        Index(
+            "ix_api_keys_active",
+            "user_id",
+            postgresql_where=text("revoked = false"),
+            sqlite_where=text("revoked = 0"),
+        ),
+        # Per-user listing, newest first; matches the (created_at, id) keyset cursor
+        Index("ix_api_keys_user_created", "user_id", desc("created_at"), desc("id")),
+    )
     
     id = Column(UUID(as_uuid=True), primary_key=True, default=uuid.uuid4)
     user_id = Column(UUID(as_uuid=True), ForeignKey("users.id", ondelete="CASCADE"), nullable=False)
-    key_prefix = Column(String, index=True, nullable=False)
-    key_hash = Column(String, unique=True, nullable=False)
+    key_prefix = Column(LargeBinary(6), nullable=False)  # Decoded first 8 chars of the random part
+    key_hash = Column(String, unique=True, nullable=False)  # HMAC-SHA256 hex, validation lookup key
     name = Column(String, nullable=False)
-    permissions = Column(JSON, nullable=False)  # List of permissions: ["deposit", "transfer", "read"]
+    permissions_bits = Column(SmallInteger, nullable=False)  # Bitmask of PERMISSION_* flags
     expires_at = Column(DateTime, nullable=False)
     revoked = Column(Boolean, default=False, nullable=False)
     
@@ -26,6 +69,15 @@ class APIKey(BaseModel):
     def __repr__(self):
         return f"<APIKey {self.name} User: {self.user_id}>"
     
+    @property
+    def permissions(self) -> tuple[str, ...]:
+        """Granted permission names, e.g. ("read", "deposit")."""
+        return decode_permissions(self.permissions_bits)
+    
+    def has_permission(self, permission: str) -> bool:
+        """Check if the key grants a single permission."""
+        return bool(self.permissions_bits & PERMISSION_BITS[permission])
+    
     def is_valid(self) -> bool:
         """Check if API key is valid (not expired and not revoked)."""
         return not self.revoked and datetime.utcnow() < self.expires_at
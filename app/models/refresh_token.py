@@ -1,6 +1,6 @@
 import uuid
 from datetime import datetime
-from sqlalchemy import String, Column, ForeignKey, Boolean, DateTime
+from sqlalchemy import Column, ForeignKey, Boolean, DateTime, Index, LargeBinary, text
 from sqlalchemy.orm import relationship
 from sqlalchemy.dialects.postgresql import UUID
 from app.db.base import BaseModel
@@ -10,10 +10,20 @@ class RefreshToken(BaseModel):
     """Refresh token model for token-based authentication."""
     
     __tablename__ = "refresh_tokens"
+    __table_args__ = (
+        # Revoked tokens are never looked up again, so keep them out of the index
+        Index(
+            "ix_refresh_token_hash_active",
+            "token_hash",
+            unique=True,
+            postgresql_where=text("revoked = false"),
+            sqlite_where=text("revoked = 0"),
+        ),
+    )
     
     id = Column(UUID(as_uuid=True), primary_key=True, default=uuid.uuid4)
     user_id = Column(UUID(as_uuid=True), ForeignKey("users.id", ondelete="CASCADE"), nullable=False, index=True)
-    token_hash = Column(String, nullable=False)
+    token_hash = Column(LargeBinary(32), nullable=False)  # HMAC-SHA256 digest of the token
     expires_at = Column(DateTime, nullable=False)
     revoked = Column(Boolean, default=False, nullable=False)
     
@@ -3,7 +3,7 @@ from decimal import Decimal
 from enum import Enum
 from sqlalchemy import String, Column, ForeignKey, Numeric, Enum as SQLEnum, JSON
 from sqlalchemy.orm import relationship
-from sqlalchemy.dialects.postgresql import UUID
+from sqlalchemy.dialects.postgresql import UUID, JSONB
 from app.db.base import BaseModel
 
 
@@ -32,7 +32,8 @@ class Transaction(BaseModel):
     amount = Column(Numeric(precision=10, scale=2), nullable=False)
     reference = Column(String, unique=True, nullable=False, index=True)
     status = Column(SQLEnum(TransactionStatus), default=TransactionStatus.PENDING, nullable=False)
-    meta = Column(JSON, nullable=True)  # Additional data: recipient_wallet, sender_wallet, etc.
+    # Additional data: recipient_wallet, sender_wallet, etc. Stored as binary JSONB on Postgres
+    meta = Column(JSON().with_variant(JSONB(), "postgresql"), nullable=True)
     
     # Relationships
     wallet = relationship("Wallet", back_populates="transactions")
@@ -1,6 +1,7 @@
-from pydantic import BaseModel, EmailStr, Field
+from pydantic import BaseModel, ConfigDict, EmailStr, Field, with_config
 from datetime import datetime
 from uuid import UUID
+from typing import TypedDict
 
 
 class UserBase(BaseModel):
@@ -20,8 +21,7 @@ class UserResponse(UserBase):
     google_id: str
     created_at: datetime
     
-    class Config:
-        from_attributes = True
+    model_config = ConfigDict(from_attributes=True, frozen=True, extra="ignore")
 
 
 class TokenResponse(BaseModel):
@@ -45,19 +45,18 @@ class RefreshRequest(BaseModel):
     }
 
 
-class RefreshTokenData(BaseModel):
-    """Refresh token response data."""
-    access_token: str
-    token_type: str = "bearer"
-    
-    model_config = {
-        "json_schema_extra": {
-            "example": {
-                "access_token": "eyJhbGciOiJIUzI1NiIsInR5cCI6IkpXVCJ9...",
-                "token_type": "bearer"
-            }
+@with_config({
+    "json_schema_extra": {
+        "example": {
+            "access_token": "eyJhbGciOiJIUzI1NiIsInR5cCI6IkpXVCJ9...",
+            "token_type": "bearer"
         }
     }
+})
+class RefreshTokenData(TypedDict):
+    """Refresh token response data."""
+    access_token: str
+    token_type: str
 
 
 class RefreshSuccessResponse(BaseModel):
@@ -83,17 +82,16 @@ class RefreshSuccessResponse(BaseModel):
 
 
 # Response models for Swagger UI
-class GoogleAuthData(BaseModel):
-    """Google OAuth URL data."""
-    authorization_url: str
-    
-    model_config = {
-        "json_schema_extra": {
-            "example": {
-                "authorization_url": "https://accounts.google.com/o/oauth2/v2/auth?client_id=..."
-            }
+@with_config({
+    "json_schema_extra": {
+        "example": {
+            "authorization_url": "https://accounts.google.com/o/oauth2/v2/auth?client_id=..."
         }
     }
+})
+class GoogleAuthData(TypedDict):
+    """Google OAuth URL data."""
+    authorization_url: str
 
 
 class GoogleAuthSuccessResponse(BaseModel):
@@ -1,4 +1,4 @@
-from pydantic import BaseModel
+from pydantic import BaseModel, ConfigDict
 from decimal import Decimal
 from datetime import datetime
 from uuid import UUID
@@ -14,8 +14,7 @@ class TransactionResponse(BaseModel):
     status: TransactionStatus
     created_at: datetime
     
-    class Config:
-        from_attributes = True
+    model_config = ConfigDict(from_attributes=True, frozen=True, extra="ignore")
 
 
 class DepositStatusResponse(BaseModel):
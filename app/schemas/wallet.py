@@ -1,8 +1,8 @@
-from pydantic import BaseModel, Field
+from pydantic import BaseModel, ConfigDict, Field, with_config
 from decimal import Decimal
 from datetime import datetime
 from uuid import UUID
-from typing import List
+from typing import List, TypedDict
 
 
 class WalletResponse(BaseModel):
@@ -12,8 +12,7 @@ class WalletResponse(BaseModel):
     balance: Decimal
     created_at: datetime
     
-    class Config:
-        from_attributes = True
+    model_config = ConfigDict(from_attributes=True, frozen=True, extra="ignore")
 
 
 class BalanceResponse(BaseModel):
@@ -62,19 +61,18 @@ class TransferResponse(BaseModel):
 
 
 # Response models for Swagger UI
-class BalanceData(BaseModel):
+@with_config({
+    "json_schema_extra": {
+        "example": {
+            "wallet_number": "1234567890123",
+            "balance": "5000.00"
+        }
+    }
+})
+class BalanceData(TypedDict):
     """Balance data."""
     wallet_number: str
     balance: str
-    
-    model_config = {
-        "json_schema_extra": {
-            "example": {
-                "wallet_number": "1234567890123",
-                "balance": "5000.00"
-            }
-        }
-    }
 
 
 class BalanceSuccessResponse(BaseModel):
@@ -99,21 +97,20 @@ class BalanceSuccessResponse(BaseModel):
     }
 
 
-class DepositData(BaseModel):
+@with_config({
+    "json_schema_extra": {
+        "example": {
+            "reference": "DEP_ABC123XYZ",
+            "authorization_url": "https://checkout.paystack.com/xyz",
+            "amount": "5000.00"
+        }
+    }
+})
+class DepositData(TypedDict):
     """Deposit initialization data."""
     reference: str
     authorization_url: str
     amount: str
-    
-    model_config = {
-        "json_schema_extra": {
-            "example": {
-                "reference": "DEP_ABC123XYZ",
-                "authorization_url": "https://checkout.paystack.com/xyz",
-                "amount": "5000.00"
-            }
-        }
-    }
 
 
 class DepositSuccessResponse(BaseModel):
@@ -139,21 +136,20 @@ class DepositSuccessResponse(BaseModel):
     }
 
 
-class TransferData(BaseModel):
+@with_config({
+    "json_schema_extra": {
+        "example": {
+            "status": "success",
+            "amount": "1000.00",
+            "recipient_wallet": "1234567890123"
+        }
+    }
+})
+class TransferData(TypedDict):
     """Transfer data."""
     status: str
     amount: str
     recipient_wallet: str
-    
-    model_config = {
-        "json_schema_extra": {
-            "example": {
-                "status": "success",
-                "amount": "1000.00",
-                "recipient_wallet": "1234567890123"
-            }
-        }
-    }
 
 
 class TransferSuccessResponse(BaseModel):
@@ -179,7 +175,19 @@ class TransferSuccessResponse(BaseModel):
     }
 
 
-class TransactionItem(BaseModel):
+@with_config({
+    "json_schema_extra": {
+        "example": {
+            "id": "3fa85f64-5717-4562-b3fc-2c963f66afa6",
+            "type": "DEPOSIT",
+            "amount": "5000.00",
+            "reference": "DEP_ABC123XYZ",
+            "status": "SUCCESS",
+            "created_at": "2025-12-11T09:10:30.275Z"
+        }
+    }
+})
+class TransactionItem(TypedDict):
     """Transaction item."""
     id: str
     type: str
@@ -187,22 +195,9 @@ class TransactionItem(BaseModel):
     reference: str
     status: str
     created_at: str
-    
-    model_config = {
-        "json_schema_extra": {
-            "example": {
-                "id": "3fa85f64-5717-4562-b3fc-2c963f66afa6",
-                "type": "DEPOSIT",
-                "amount": "5000.00",
-                "reference": "DEP_ABC123XYZ",
-                "status": "SUCCESS",
-                "created_at": "2025-12-11T09:10:30.275Z"
-            }
-        }
-    }
 
 
-class TransactionsData(BaseModel):
+class TransactionsData(TypedDict):
     """Transactions data."""
     transactions: List[TransactionItem]
     count: int
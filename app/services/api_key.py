@@ -1,13 +1,68 @@
-import secrets
+import base64
+import hashlib
+import os
+from dataclasses import dataclass
 from datetime import datetime
-from typing import Optional
-from sqlalchemy import select, func
+from typing import Optional, Sequence
+from uuid import UUID
+from cachetools import TTLCache
+from sqlalchemy import Row, and_, select, tuple_
 from sqlalchemy.ext.asyncio import AsyncSession
-from app.models import APIKey
+from app.config import settings
+from app.models import APIKey, encode_permissions
+from app.models.api_key import PERMISSION_BITS
 from app.schemas.api_key import APIKeyCreate, APIKeyRollover
-from app.services.auth import hash_key, parse_expiry
+from app.services.auth import hash_token, parse_expiry
 from app.utils.logger import logger
 
+# Recently validated keys, keyed by a keyed digest of the plaintext key, so repeat
+# requests skip the DB lookup. The cache is per process: revoking evicts the
+# local entry, but other workers keep accepting the key until their entry
+# expires, so the TTL is the cross-worker revocation window.
+_validated_keys: TTLCache = TTLCache(maxsize=10_000, ttl=30)
+_CACHE_KEY_SECRET = hashlib.sha256(settings.SECRET_KEY.encode("utf-8")).digest()
+
+
+# Bound once so key generation skips the token_urlsafe wrapper and attribute lookups
+_b64 = base64.urlsafe_b64encode
+_rand = os.urandom
+
+
+@dataclass(frozen=True, slots=True)
+class ValidatedAPIKey:
+    """
+    Immutable snapshot of a validated API key.
+    
+    Cached across requests instead of the ORM instance, which belongs to the
+    session that loaded it and is expired by any rollback in that session.
+    """
+    id: UUID
+    user_id: UUID
+    permissions_bits: int
+    expires_at: datetime
+    revoked: bool
+    
+    def has_permission(self, permission: str) -> bool:
+        """Check if the key grants a single permission."""
+        return bool(self.permissions_bits & PERMISSION_BITS[permission])
+    
+    def is_valid(self) -> bool:
+        """Check if API key is valid (not expired and not revoked)."""
+        return not self.revoked and datetime.utcnow() < self.expires_at
+
+
+def _cache_key(api_key: str) -> bytes:
+    """Derive the validated-key cache key without keeping the plaintext in memory."""
+    return hashlib.blake2b(api_key.encode("utf-8"), digest_size=16, key=_CACHE_KEY_SECRET).digest()
+
+
+def _evict_cached_key(key_id: str) -> None:
+    """Drop a key from the validated-key cache (e.g. after revocation)."""
+    key_id = str(key_id)
+    for cache_key, cached in list(_validated_keys.items()):
+        if str(cached.id) == key_id:
+            _validated_keys.pop(cache_key, None)
+
 
 def generate_api_key() -> str:
     """
@@ -16,8 +71,18 @@ def generate_api_key() -> str:
     Returns:
         API key string in format: sk_live_<random_string>
     """
-    random_part = secrets.token_urlsafe(32)
-    return f"sk_live_{random_part}"
+    return "sk_live_" + _b64(_rand(32)).rstrip(b"=").decode()
+
+
+def extract_key_prefix(api_key: str) -> bytes:
+    """
+    Extract the display prefix from an API key.
+    
+    The first 8 base64url chars of the random part (after sk_live_), decoded
+    to 6 raw bytes. It identifies a key without storing it; lookups go
+    through key_hash.
+    """
+    return base64.urlsafe_b64decode(api_key[8:16])
 
 
 async def create_api_key(
@@ -39,14 +104,17 @@ async def create_api_key(
     Raises:
         ValueError: If user has 5 or more active keys
     """
-    # Check active key count
+    now = datetime.utcnow()
+    
+    # Check active key count; fetching at most 5 ids stops the scan at the limit
     result = await db.execute(
-        select(func.count(APIKey.id))
+        select(APIKey.id)
         .where(APIKey.user_id == user_id)
         .where(APIKey.revoked == False)
-        .where(APIKey.expires_at > datetime.utcnow())
+        .where(APIKey.expires_at > now)
+        .limit(5)
     )
-    active_count = result.scalar()
+    active_count = len(result.scalars().all())
     
     if active_count >= 5:
         logger.warning(f"API key creation failed - user has {active_count} active keys", extra={"user_id": user_id})
@@ -56,16 +124,12 @@ async def create_api_key(
     
     # Generate and hash key
     plain_key = generate_api_key()
-    key_hash = hash_key(plain_key)
+    key_hash = hash_token(plain_key)
     
-    # Extract prefix (after sk_live_)
-    # Key format: sk_live_<random_part>
-    # We use the first 8 chars of the random part as prefix for lookup security
-    # plain_key[8:16] gets the first 8 chars of the random part
-    key_prefix = plain_key[8:16]
+    key_prefix = extract_key_prefix(plain_key)
     
     # Parse expiry
-    expires_at = parse_expiry(key_data.expiry)
+    expires_at = parse_expiry(key_data.expiry, now)
     
     # Create API key
     api_key = APIKey(
@@ -73,13 +137,12 @@ async def create_api_key(
         key_hash=key_hash,
         key_prefix=key_prefix,
         name=key_data.name,
-        permissions=key_data.permissions,
+        permissions_bits=encode_permissions(key_data.permissions),
         expires_at=expires_at
     )
     
     db.add(api_key)
     await db.commit()
-    await db.refresh(api_key)
     
     logger.info(f"API key created successfully", extra={"key_id": str(api_key.id), "expires_at": expires_at.isoformat()})
     
@@ -117,7 +180,8 @@ async def rollover_api_key(
         logger.warning(f"API key rollover failed - key not found", extra={"key_id": rollover_data.expired_key_id})
         raise ValueError("API key not found or not owned by user")
     
-    if old_key.expires_at > datetime.utcnow():
+    now = datetime.utcnow()
+    if old_key.expires_at > now:
         logger.warning(f"API key rollover failed - key not expired", extra={"key_id": rollover_data.expired_key_id})
         raise ValueError("API key is not expired yet")
     
@@ -125,22 +189,21 @@ async def rollover_api_key(
     
     # Generate new key with same permissions
     plain_key = generate_api_key()
-    key_hash = hash_key(plain_key)
-    key_prefix = plain_key[8:16]
-    expires_at = parse_expiry(rollover_data.expiry)
+    key_hash = hash_token(plain_key)
+    key_prefix = extract_key_prefix(plain_key)
+    expires_at = parse_expiry(rollover_data.expiry, now)
     
     new_key = APIKey(
         user_id=user_id,
         key_hash=key_hash,
         key_prefix=key_prefix,
         name=old_key.name,
-        permissions=old_key.permissions,
+        permissions_bits=old_key.permissions_bits,
         expires_at=expires_at
     )
     
     db.add(new_key)
     await db.commit()
-    await db.refresh(new_key)
     
     logger.info(f"API key rolled over successfully", extra={"new_key_id": str(new_key.id)})
     
@@ -180,11 +243,12 @@ async def revoke_api_key(
     
     if api_key.revoked:
         logger.info(f"API key already revoked", extra={"key_id": key_id})
+        _evict_cached_key(key_id)
         return api_key
     
     api_key.revoked = True
     await db.commit()
-    await db.refresh(api_key)
+    _evict_cached_key(key_id)
     
     logger.info(f"API key revoked successfully", extra={"key_id": key_id, "user_id": user_id})
     
@@ -194,61 +258,90 @@ async def revoke_api_key(
 async def validate_api_key(
     db: AsyncSession,
     api_key: str
-) -> Optional[APIKey]:
+) -> Optional[ValidatedAPIKey]:
     """
-    Validate an API key and return the associated APIKey model.
+    Validate an API key and return a snapshot of its stored row.
     """
-    if not api_key.startswith("sk_live_") or len(api_key) < 16:
+    if not api_key.startswith("sk_live_"):
         return None
-        
-    # Extract prefix
-    key_prefix = api_key[8:16]
     
-    # Lookup by prefix (O(1) operation)
+    cache_key = _cache_key(api_key)
+    cached = _validated_keys.get(cache_key)
+    if cached is not None and cached.is_valid():
+        return cached
+    
+    # key_hash is a deterministic HMAC with a unique index: one probe, no per-candidate verify
     result = await db.execute(
-        select(APIKey)
-        .where(APIKey.key_prefix == key_prefix)
+        select(
+            APIKey.id,
+            APIKey.user_id,
+            APIKey.permissions_bits,
+            APIKey.expires_at,
+            APIKey.revoked
+        )
+        .where(APIKey.key_hash == hash_token(api_key))
         .where(APIKey.revoked == False)
         .where(APIKey.expires_at > datetime.utcnow())
     )
-    # Theoretically there could be prefix collisions (rare), so we get all matches
-    candidate_keys = result.scalars().all()
-    
-    # Verify hash against candidates
-    from app.services.auth import verify_key
-    for key_model in candidate_keys:
-        if verify_key(api_key, key_model.key_hash):
-            return key_model
-            
-    return None
+    row = result.one_or_none()
+    
+    if row is None:
+        return None
+    
+    validated = ValidatedAPIKey(*row)
+    _validated_keys[cache_key] = validated
+    return validated
 
 
 async def list_user_api_keys(
     db: AsyncSession,
     user_id: str,
-    limit: int = 20
-) -> list[APIKey]:
+    limit: int = 20,
+    after: Optional[datetime] = None,
+    after_id: Optional[UUID] = None
+) -> Sequence[Row]:
     """
-    List all API keys for a user with pagination.
+    List all API keys for a user with keyset pagination.
+    
+    Only the listed columns are selected and validity is computed in SQL,
+    so the rows can be serialized directly without building ORM objects.
     
     Args:
         db: Database session
         user_id: User ID
         limit: Maximum number of keys to return (default: 20)
+        after: created_at of the last key on the previous page
+        after_id: id of the last key on the previous page; keys sharing its
+            created_at are split on id so none are skipped
         
     Returns:
-        List of APIKey models ordered by created_at descending
+        Rows of (id, name, permissions_bits, created_at, expires_at, is_valid)
+        ordered by (created_at, id) descending
     """
     logger.debug(f"Listing API keys for user: {user_id}", extra={"limit": limit})
     
-    result = await db.execute(
-        select(APIKey)
+    query = (
+        select(
+            APIKey.id,
+            APIKey.name,
+            APIKey.permissions_bits,
+            APIKey.created_at,
+            APIKey.expires_at,
+            and_(APIKey.revoked == False, APIKey.expires_at > datetime.utcnow()).label("is_valid")
+        )
         .where(APIKey.user_id == user_id)
-        .order_by(APIKey.created_at.desc())
+        .order_by(APIKey.created_at.desc(), APIKey.id.desc())
         .limit(limit)
     )
     
-    keys = list(result.scalars().all())
+    if after and after_id:
+        query = query.where(tuple_(APIKey.created_at, APIKey.id) < tuple_(after, after_id))
+    elif after:
+        query = query.where(APIKey.created_at < after)
+    
+    result = await db.execute(query)
+    
+    keys = result.all()
     
     logger.info(
         f"Retrieved {len(keys)} API keys for user",
@@ -1,32 +1,50 @@
+import hashlib
+import hmac
 import secrets
 from datetime import datetime, timedelta
 from typing import Optional, Tuple
 
-import bcrypt
-import httpx
-from jose import JWTError, jwt
+import jwt
 from sqlalchemy import select
 from sqlalchemy.ext.asyncio import AsyncSession
 
 from app.config import settings
+from app.core.http import get_http_client
 from app.models import RefreshToken, User
 from app.services.user import get_or_create_user_from_google
 
 GOOGLE_TOKEN_ENDPOINT = "https://oauth2.googleapis.com/token"
 GOOGLE_USERINFO_ENDPOINT = "https://www.googleapis.com/oauth2/v1/userinfo"
 
+# Server-side pepper for token HMACs. Kept separate from the JWT signing key when
+# API_KEY_PEPPER is set; defaults to SECRET_KEY so existing hashes still match.
+TOKEN_PEPPER = (settings.API_KEY_PEPPER or settings.SECRET_KEY).encode("utf-8")
 
-def hash_key(key: str) -> str:
-    """Hash an API key or password using bcrypt."""
-    return bcrypt.hashpw(key.encode("utf-8"), bcrypt.gensalt()).decode("utf-8")
 
+def _token_hmac(token: str) -> hmac.HMAC:
+    """HMAC-SHA256 of a token keyed with the server-side pepper."""
+    return hmac.new(TOKEN_PEPPER, token.encode("utf-8"), hashlib.sha256)
 
-def verify_key(plain_key: str, hashed_key: str) -> bool:
-    """Verify a plain key against its hash."""
-    return bcrypt.checkpw(
-        plain_key.encode("utf-8"),
-        hashed_key.encode("utf-8"),
-    )
+
+def hash_token(token: str) -> str:
+    """
+    Hash a high-entropy token (API key) for storage.
+    
+    Generated tokens carry ~256 bits of entropy, so they cannot be brute-forced
+    and key stretching (bcrypt/Argon2) adds no security, only tens of ms per
+    check. A single keyed HMAC is enough.
+    """
+    return _token_hmac(token).hexdigest()
+
+
+def hash_refresh_token(token: str) -> bytes:
+    """
+    Hash a refresh token to the 32-byte lookup digest stored in the database.
+    
+    Deterministic, so tokens are found with a single index probe, but keyed,
+    so a leaked table alone cannot be used to check guesses.
+    """
+    return _token_hmac(token).digest()
 
 
 def create_access_token(data: dict, expires_delta: Optional[timedelta] = None) -> str:
@@ -48,15 +66,15 @@ def decode_access_token(token: str) -> Optional[dict]:
     try:
         payload = jwt.decode(token, settings.SECRET_KEY, algorithms=[settings.ALGORITHM])
         return payload
-    except JWTError:
+    except jwt.InvalidTokenError:
         return None
 
 
-def parse_expiry(expiry: str) -> datetime:
-    """Parse expiry string (1H, 1D, 1M, 1Y) to datetime."""
+def parse_expiry(expiry: str, now: Optional[datetime] = None) -> datetime:
+    """Parse expiry string (1H, 1D, 1M, 1Y) to datetime, relative to ``now`` if given."""
     value = int(expiry[:-1])
     unit = expiry[-1].upper()
-    now = datetime.utcnow()
+    now = now or datetime.utcnow()
     
     if unit == "H":
         return now + timedelta(hours=value)
@@ -80,18 +98,18 @@ async def process_google_oauth_callback(db: AsyncSession, code: str) -> Tuple[Us
         "grant_type": "authorization_code"
     }
     
-    async with httpx.AsyncClient() as client:
-        token_response = await client.post(GOOGLE_TOKEN_ENDPOINT, data=token_data)
-        token_response.raise_for_status()
-        tokens = token_response.json()
-        
-        if not (access_token := tokens.get("access_token")):
-            raise ValueError("Failed to get access token from Google")
-        
-        headers = {"Authorization": f"Bearer {access_token}"}
-        userinfo_response = await client.get(GOOGLE_USERINFO_ENDPOINT, headers=headers)
-        userinfo_response.raise_for_status()
-        user_info = userinfo_response.json()
+    client = get_http_client()
+    token_response = await client.post(GOOGLE_TOKEN_ENDPOINT, data=token_data)
+    token_response.raise_for_status()
+    tokens = token_response.json()
+    
+    if not (access_token := tokens.get("access_token")):
+        raise ValueError("Failed to get access token from Google")
+    
+    headers = {"Authorization": f"Bearer {access_token}"}
+    userinfo_response = await client.get(GOOGLE_USERINFO_ENDPOINT, headers=headers)
+    userinfo_response.raise_for_status()
+    user_info = userinfo_response.json()
     
     email = user_info.get("email")
     google_id = user_info.get("id")
@@ -111,14 +129,13 @@ async def process_google_oauth_callback(db: AsyncSession, code: str) -> Tuple[Us
 async def create_refresh_token(db: AsyncSession, user_id: str) -> str:
     """Create refresh token for user (30 days expiry)."""
     plain_token = secrets.token_urlsafe(32)
-    token_hash = hash_key(plain_token)
+    token_hash = hash_refresh_token(plain_token)
     expires_at = datetime.utcnow() + timedelta(days=settings.REFRESH_TOKEN_EXPIRE_DAYS)
     
     refresh_token = RefreshToken(user_id=user_id, token_hash=token_hash, expires_at=expires_at)
     
     db.add(refresh_token)
     await db.commit()
-    await db.refresh(refresh_token)
     
     return plain_token
 
@@ -134,24 +151,21 @@ async def validate_refresh_token(db: AsyncSession, token: str) -> Optional[User]
     Returns:
         User model if token is valid, None otherwise
     """
-    # Get all non-revoked, non-expired tokens
     result = await db.execute(
         select(RefreshToken)
+        .where(RefreshToken.token_hash == hash_refresh_token(token))
         .where(RefreshToken.revoked == False)
         .where(RefreshToken.expires_at > datetime.utcnow())
     )
-    candidate_tokens = result.scalars().all()
+    refresh_token = result.scalar_one_or_none()
     
-    # Verify hash against candidates
-    for refresh_token in candidate_tokens:
-        if verify_key(token, refresh_token.token_hash):
-            # Found matching token, return user
-            result = await db.execute(
-                select(User).where(User.id == refresh_token.user_id)
-            )
-            return result.scalar_one_or_none()
+    if not refresh_token:
+        return None
     
-    return None
+    result = await db.execute(
+        select(User).where(User.id == refresh_token.user_id)
+    )
+    return result.scalar_one_or_none()
 
 
 async def revoke_refresh_token(db: AsyncSession, token: str) -> bool:
@@ -165,18 +179,16 @@ async def revoke_refresh_token(db: AsyncSession, token: str) -> bool:
     Returns:
         True if token was revoked, False if not found
     """
-    # Get all non-revoked tokens
     result = await db.execute(
-        select(RefreshToken).where(RefreshToken.revoked == False)
+        select(RefreshToken)
+        .where(RefreshToken.token_hash == hash_refresh_token(token))
+        .where(RefreshToken.revoked == False)
     )
-    candidate_tokens = result.scalars().all()
+    refresh_token = result.scalar_one_or_none()
     
-    # Find and revoke matching token
-    for refresh_token in candidate_tokens:
-        if verify_key(token, refresh_token.token_hash):
-            refresh_token.revoked = True
-            await db.commit()
-            return True
+    if not refresh_token:
+        return False
     
-    return False
-
+    refresh_token.revoked = True
+    await db.commit()
+    return True
@@ -1,4 +1,3 @@
-import uuid
 from decimal import Decimal
 from typing import Dict
 from sqlalchemy.ext.asyncio import AsyncSession
@@ -30,15 +29,15 @@ async def initialize_deposit(
         Exception: If Paystack initialization fails
     """
     # Generate unique reference
-    reference = f"DEP_{uuid.uuid4().hex[:12].upper()}"
+    reference = transaction_service.generate_reference("DEP")
     
     logger.info(
         f"Initializing deposit for wallet: {wallet.wallet_number}",
         extra={"amount": str(amount), "reference": reference}
     )
     
-    # Create pending transaction
-    await transaction_service.create_pending_transaction(
+    # Stage pending transaction; only committed once Paystack accepts it
+    transaction_service.add_pending_transaction(
         db=db,
         wallet_id=str(wallet.id),
         amount=amount,
@@ -46,11 +45,17 @@ async def initialize_deposit(
     )
     
     # Initialize Paystack transaction
-    paystack_data = await paystack_service.initialize_transaction(
-        email=user_email,
-        amount=amount,
-        reference=reference
-    )
+    try:
+        paystack_data = await paystack_service.initialize_transaction(
+            email=user_email,
+            amount=amount,
+            reference=reference
+        )
+    except Exception:
+        await db.rollback()
+        raise
+    
+    await db.commit()
     
     logger.info(
         f"Deposit initialized successfully",
@@ -1,11 +1,12 @@
-import httpx
-import hashlib
 import hmac
 from typing import Optional
 from decimal import Decimal
 from app.config import settings
+from app.core.http import get_http_client
 from app.utils.logger import logger
 
+_WEBHOOK_KEY = settings.PAYSTACK_SECRET_KEY.encode("utf-8")
+
 
 class PaystackService:
     """Service for interacting with Paystack API."""
@@ -51,21 +52,21 @@ class PaystackService:
             "callback_url": f"{settings.APP_BASE_URL}/api/v1/wallet/payment/callback"
         }
         
-        async with httpx.AsyncClient() as client:
-            response = await client.post(
-                f"{self.BASE_URL}/transaction/initialize",
-                json=payload,
-                headers=self.headers
-            )
-            response.raise_for_status()
-            data = response.json()
-            
-            if data["status"]:
-                logger.info(f"Paystack transaction initialized: {reference}")
-                return data["data"]
-            else:
-                logger.error(f"Paystack initialization failed: {data.get('message')}")
-                raise Exception(f"Paystack error: {data.get('message', 'Unknown error')}")
+        client = get_http_client()
+        response = await client.post(
+            f"{self.BASE_URL}/transaction/initialize",
+            json=payload,
+            headers=self.headers
+        )
+        response.raise_for_status()
+        data = response.json()
+        
+        if data["status"]:
+            logger.info(f"Paystack transaction initialized: {reference}")
+            return data["data"]
+        else:
+            logger.error(f"Paystack initialization failed: {data.get('message')}")
+            raise Exception(f"Paystack error: {data.get('message', 'Unknown error')}")
     
     async def verify_transaction(self, reference: str) -> dict:
         """
@@ -79,20 +80,20 @@ class PaystackService:
         """
         logger.debug(f"Verifying Paystack transaction: {reference}")
         
-        async with httpx.AsyncClient() as client:
-            response = await client.get(
-                f"{self.BASE_URL}/transaction/verify/{reference}",
-                headers=self.headers
-            )
-            response.raise_for_status()
-            data = response.json()
-            
-            if data["status"]:
-                logger.info(f"Paystack transaction verified: {reference}")
-                return data["data"]
-            else:
-                logger.error(f"Paystack verification failed: {data.get('message')}")
-                raise Exception(f"Paystack error: {data.get('message', 'Unknown error')}")
+        client = get_http_client()
+        response = await client.get(
+            f"{self.BASE_URL}/transaction/verify/{reference}",
+            headers=self.headers
+        )
+        response.raise_for_status()
+        data = response.json()
+        
+        if data["status"]:
+            logger.info(f"Paystack transaction verified: {reference}")
+            return data["data"]
+        else:
+            logger.error(f"Paystack verification failed: {data.get('message')}")
+            raise Exception(f"Paystack error: {data.get('message', 'Unknown error')}")
     
     @staticmethod
     def validate_webhook_signature(body: bytes, signature: str) -> bool:
@@ -106,11 +107,8 @@ class PaystackService:
         Returns:
             True if signature is valid, False otherwise
         """
-        computed_signature = hmac.new(
-            settings.PAYSTACK_SECRET_KEY.encode('utf-8'),
-            body,
-            hashlib.sha512
-        ).hexdigest()
+        # One-shot C implementation; skips building a Python HMAC object
+        computed_signature = hmac.digest(_WEBHOOK_KEY, body, "sha512").hex()
         
         is_valid = hmac.compare_digest(computed_signature, signature)
         
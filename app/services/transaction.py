@@ -1,18 +1,37 @@
+import secrets
 from decimal import Decimal
 from typing import Optional
-from sqlalchemy import select
+from sqlalchemy import bindparam, select
 from sqlalchemy.ext.asyncio import AsyncSession
+from sqlalchemy.orm import joinedload
 from app.models import Transaction, TransactionType, TransactionStatus
 
+# Built once at import and reused with a bound reference, so each lookup skips
+# constructing the statement and hits SQLAlchemy's compiled cache directly
+_GET_TX_BY_REF = select(Transaction).where(Transaction.reference == bindparam("ref"))
+_GET_TX_AND_WALLET_BY_REF = _GET_TX_BY_REF.options(joinedload(Transaction.wallet))
 
-async def create_pending_transaction(
+
+def generate_reference(prefix: str) -> str:
+    """
+    Generate a unique transaction reference, e.g. DEP_9F86D081884C7D65.
+    
+    64 random bits from the OS CSPRNG, read directly without building a UUID.
+    """
+    return f"{prefix}_{secrets.token_hex(8).upper()}"
+
+
+def add_pending_transaction(
     db: AsyncSession,
     wallet_id: str,
     amount: Decimal,
     reference: str
 ) -> Transaction:
     """
-    Create a pending deposit transaction.
+    Stage a pending deposit transaction in the session without committing.
+    
+    The caller commits once the payment provider accepts the transaction,
+    or rolls back so no orphaned pending row is left behind.
     
     Args:
         db: Database session
@@ -21,7 +40,7 @@ async def create_pending_transaction(
         reference: Unique transaction reference
         
     Returns:
-        Created transaction
+        Staged transaction
     """
     transaction = Transaction(
         wallet_id=wallet_id,
@@ -32,15 +51,14 @@ async def create_pending_transaction(
     )
     
     db.add(transaction)
-    await db.commit()
-    await db.refresh(transaction)
     
     return transaction
 
 
 async def get_transaction_by_reference(
     db: AsyncSession,
-    reference: str
+    reference: str,
+    eager: bool = False
 ) -> Optional[Transaction]:
     """
     Get a transaction by reference.
@@ -48,13 +66,13 @@ async def get_transaction_by_reference(
     Args:
         db: Database session
         reference: Transaction reference
+        eager: Also load the transaction's wallet in the same (joined) query
         
     Returns:
         Transaction model or None
     """
-    result = await db.execute(
-        select(Transaction).where(Transaction.reference == reference)
-    )
+    query = _GET_TX_AND_WALLET_BY_REF if eager else _GET_TX_BY_REF
+    result = await db.execute(query, {"ref": reference})
     return result.scalar_one_or_none()
 
 
@@ -76,6 +94,5 @@ async def update_transaction_status(
     """
     transaction.status = status
     await db.commit()
-    await db.refresh(transaction)
     
     return transaction
@@ -55,7 +55,6 @@ async def get_or_create_user_from_google(
     
     # Commit transaction
     await db.commit()
-    await db.refresh(user)
     
     logger.info(
         f"New user created successfully: {email}",
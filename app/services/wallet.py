@@ -1,8 +1,9 @@
 from decimal import Decimal
-from typing import Optional
-from sqlalchemy import select
+from typing import Optional, Sequence
+from sqlalchemy import Row, select
 from sqlalchemy.ext.asyncio import AsyncSession
 from app.models import Wallet, Transaction, TransactionType, TransactionStatus, User
+from app.services.transaction import generate_reference
 from app.utils.logger import logger
 
 
@@ -37,30 +38,6 @@ async def get_wallet_by_number(
     return result.scalar_one_or_none()
 
 
-async def credit_wallet(
-    db: AsyncSession,
-    wallet: Wallet,
-    amount: Decimal,
-    transaction: Transaction
-) -> Wallet:
-    """Credit wallet and update transaction status."""
-    if amount <= 0:
-        raise ValueError("Amount must be positive")
-
-    logger.info(f"Crediting wallet: {wallet.wallet_number}",extra={"amount": str(amount), "transaction_ref": transaction.reference})
-    
-    wallet.balance += amount
-    transaction.status = TransactionStatus.SUCCESS
-    
-    await db.commit()
-    await db.refresh(wallet)
-    await db.refresh(transaction)
-    
-    logger.info(f"Wallet credited: {wallet.wallet_number}, balance: {wallet.balance}")
-    
-    return wallet
-
-
 async def transfer_funds(
     db: AsyncSession,
     sender_wallet_number: str,
@@ -74,24 +51,27 @@ async def transfer_funds(
     logger.info(f"Transfer: {sender_wallet_number} → {recipient_wallet_number}, {amount}")
     
     # Deadlock Prevention: Always acquire locks in consistent order (lexical)
-    # This prevents Wallet A→B waiting for Wallet B→A
-    first_wallet_num, second_wallet_num = sorted([sender_wallet_number, recipient_wallet_number])
+    # This prevents Wallet A→B waiting for Wallet B→A. Both rows are locked in a
+    # single round-trip; Postgres takes the row locks in ORDER BY order.
+    result = await db.execute(
+        select(Wallet)
+        .where(Wallet.wallet_number.in_([sender_wallet_number, recipient_wallet_number]))
+        .order_by(Wallet.wallet_number)
+        .with_for_update()
+    )
+    wallets = {wallet.wallet_number: wallet for wallet in result.scalars().all()}
     
-    w1 = await get_wallet_by_number(db, first_wallet_num, for_update=True)
-    w2 = await get_wallet_by_number(db, second_wallet_num, for_update=True)
+    sender_wallet = wallets.get(sender_wallet_number)
+    recipient_wallet = wallets.get(recipient_wallet_number)
     
-    if not w1 or not w2:
+    if not sender_wallet or not recipient_wallet:
         raise ValueError("One or both wallets not found")
     
-    sender_wallet = w1 if w1.wallet_number == sender_wallet_number else w2
-    recipient_wallet = w2 if w2.wallet_number == recipient_wallet_number else w1
-    
     if sender_wallet.balance < amount:
         logger.warning(f"Insufficient balance: {sender_wallet.balance} < {amount}")
         raise ValueError("Insufficient balance")
     
-    import uuid
-    reference = f"TRF_{uuid.uuid4().hex[:12].upper()}"
+    reference = generate_reference("TRF")
     
     
     sender_txn = Transaction(
@@ -119,8 +99,6 @@ async def transfer_funds(
         db.add(recipient_txn)
         
         await db.commit()
-        await db.refresh(sender_txn)
-        await db.refresh(recipient_txn)
         
         logger.info(f"Transfer complete: {reference}, {amount} from {sender_wallet.wallet_number} → {recipient_wallet.wallet_number}")
         
@@ -138,12 +116,19 @@ async def get_wallet_transactions(
     db: AsyncSession,
     wallet_id: str,
     limit: int = 50
-) -> list[Transaction]:
-    """Get transaction history for wallet (default 50)."""
+) -> Sequence[Row]:
+    """Get transaction history rows for wallet (default 50), without loading ORM objects."""
     result = await db.execute(
-        select(Transaction)
+        select(
+            Transaction.id,
+            Transaction.type,
+            Transaction.amount,
+            Transaction.reference,
+            Transaction.status,
+            Transaction.created_at
+        )
         .where(Transaction.wallet_id == wallet_id)
         .order_by(Transaction.created_at.desc())
         .limit(limit)
     )
-    return list(result.scalars().all())
+    return result.all()
@@ -1,8 +1,7 @@
 from typing import Optional, Dict
-from sqlalchemy import select
+from sqlalchemy import update
 from sqlalchemy.ext.asyncio import AsyncSession
 from app.models import Transaction, TransactionStatus, Wallet
-from app.services import wallet as wallet_service
 from app.services import transaction as transaction_service
 from app.utils.logger import logger
 
@@ -21,41 +20,50 @@ async def process_successful_charge(
     Returns:
         Dict with processing status
     """
-    logger.info(f"Processing successful charge webhook: {reference}")
+    logger.info("Processing successful charge webhook: %s", reference)
     
     # Get transaction
     transaction = await transaction_service.get_transaction_by_reference(db, reference)
     
     if not transaction:
         # Transaction not found, possibly not from our system
-        logger.warning(f"Transaction not found for reference: {reference}")
+        logger.warning("Transaction not found for reference: %s", reference)
         return {"status": True, "message": "Transaction not found"}
     
     # Check if already processed
     if transaction.status == TransactionStatus.SUCCESS:
-        logger.info(f"Transaction already processed: {reference}")
+        logger.info("Transaction already processed: %s", reference)
         return {"status": True, "message": "Transaction already processed"}
     
+    # Claim the transaction with a conditional update instead of locking the wallet.
+    # Only one concurrent delivery of the same event can flip the status.
     result = await db.execute(
-        select(Wallet).where(Wallet.id == transaction.wallet_id).with_for_update()
+        update(Transaction)
+        .where(Transaction.id == transaction.id, Transaction.status != TransactionStatus.SUCCESS)
+        .values(status=TransactionStatus.SUCCESS)
+        .returning(Transaction.id)
     )
-    wallet = result.scalar_one_or_none()
-    
-    if not wallet:
-        logger.error(f"Wallet not found for transaction: {reference}")
-        raise ValueError("Wallet not found for transaction")
-    
-    # Credit wallet
-    await wallet_service.credit_wallet(
-        db=db,
-        wallet=wallet,
-        amount=transaction.amount,
-        transaction=transaction
+    
+    if result.scalar_one_or_none() is None:
+        await db.rollback()
+        logger.info("Transaction already processed: %s", reference)
+        return {"status": True, "message": "Transaction already processed"}
+    
+    # Credit wallet atomically in SQL; no read-modify-write in Python
+    result = await db.execute(
+        update(Wallet)
+        .where(Wallet.id == transaction.wallet_id)
+        .values(balance=Wallet.balance + transaction.amount)
+        .returning(Wallet.wallet_number)
     )
+    wallet_number = result.scalar_one()
+    
+    await db.commit()
     
     logger.info(
-        f"Charge processed successfully: {reference}",
-        extra={"amount": str(transaction.amount), "wallet": wallet.wallet_number}
+        "Charge processed successfully: %s",
+        reference,
+        extra={"amount": str(transaction.amount), "wallet": wallet_number}
     )
     
     return {"status": True, "message": "Wallet credited successfully"}
@@ -75,35 +83,42 @@ async def process_failed_charge(
     Returns:
         Dict with processing status
     """
-    logger.info(f"Processing failed charge webhook: {reference}")
+    logger.info("Processing failed charge webhook: %s", reference)
     
-    # Get transaction
+    # Only pending transactions can fail; the status check is part of the UPDATE so
+    # the happy path is a single round trip
+    result = await db.execute(
+        update(Transaction)
+        .where(Transaction.reference == reference, Transaction.status == TransactionStatus.PENDING)
+        .values(status=TransactionStatus.FAILED)
+        .returning(Transaction.amount, Transaction.wallet_id)
+        .execution_options(synchronize_session=False)
+    )
+    updated = result.one_or_none()
+    
+    if updated:
+        await db.commit()
+        logger.info(
+            "Transaction marked as failed: %s",
+            reference,
+            extra={"amount": str(updated.amount), "wallet_id": str(updated.wallet_id)}
+        )
+        return {"status": True, "message": "Transaction marked as failed"}
+    
+    await db.rollback()
+    
+    # Nothing updated: find out why
     transaction = await transaction_service.get_transaction_by_reference(db, reference)
     
     if not transaction:
         # Transaction not found, possibly not from our system
-        logger.warning(f"Transaction not found for reference: {reference}")
+        logger.warning("Transaction not found for reference: %s", reference)
         return {"status": True, "message": "Transaction not found"}
     
-    # Check if already marked as failed
-    if transaction.status == TransactionStatus.FAILED:
-        logger.info(f"Transaction already marked as failed: {reference}")
-        return {"status": True, "message": "Transaction already marked as failed"}
-    
     # Check if already successful (shouldn't happen, but safety check)
     if transaction.status == TransactionStatus.SUCCESS:
-        logger.warning(f"Cannot mark successful transaction as failed: {reference}")
+        logger.warning("Cannot mark successful transaction as failed: %s", reference)
         return {"status": False, "message": "Transaction already successful"}
     
-    # Mark transaction as failed
-    transaction.status = TransactionStatus.FAILED
-    await db.commit()
-    await db.refresh(transaction)
-    
-    logger.info(
-        f"Transaction marked as failed: {reference}",
-        extra={"amount": str(transaction.amount), "wallet_id": str(transaction.wallet_id)}
-    )
-    
-    return {"status": True, "message": "Transaction marked as failed"}
-
+    logger.info("Transaction already marked as failed: %s", reference)
+    return {"status": True, "message": "Transaction already marked as failed"}
@@ -0,0 +1,248 @@
+import asyncio
+import os
+import socket
+from typing import Dict, List, Optional, Tuple
+from redis.asyncio import Redis
+from redis.exceptions import ResponseError
+from app.config import settings
+from app.core.redis import get_redis
+from app.db.session import AsyncSessionLocal
+from app.services.webhook import process_successful_charge, process_failed_charge
+from app.utils.logger import logger
+
+WEBHOOK_STREAM = "paystack:events"
+WEBHOOK_DEAD_LETTER_STREAM = "paystack:events:dead"
+WEBHOOK_GROUP = "webhook-workers"
+WEBHOOK_STREAM_MAXLEN = 100_000
+WEBHOOK_BATCH_SIZE = 100
+# Events processed concurrently, each on its own session; kept within the DB pool
+WEBHOOK_CONCURRENCY = 5
+# Entries left pending this long (handler failed, or the consumer that read them
+# crashed, was stopped or redeployed) are claimed by any worker and retried
+WEBHOOK_RECLAIM_IDLE_MS = 60_000
+WEBHOOK_RECLAIM_INTERVAL = 30
+# Deliveries before an entry is moved to the dead-letter stream
+WEBHOOK_MAX_DELIVERIES = 5
+
+WEBHOOK_HANDLERS = {
+    "charge.success": process_successful_charge,
+    "charge.failed": process_failed_charge,
+}
+
+_worker_task: Optional[asyncio.Task] = None
+# One consumer per process: processes sharing a name would also share pending
+# entries, and the reclaim sweep would take over each other's in-flight events
+_consumer_name = f"{settings.WEBHOOK_CONSUMER_NAME or socket.gethostname()}-{os.getpid()}"
+
+Entry = Tuple[bytes, Optional[Dict[bytes, bytes]]]
+
+
+async def enqueue_webhook_event(event: str, reference: str) -> bool:
+    """
+    Queue a Paystack charge event for the background worker.
+    
+    Returns:
+        True if queued, False if the worker is not running (e.g. Redis was down
+        at startup) or Redis is unavailable, and the caller should process the
+        event inline
+    """
+    if _worker_task is None or _worker_task.done():
+        # Nothing in this process would read the entry, and Paystack stops
+        # retrying once it gets its 200
+        return False
+    
+    try:
+        redis = get_redis()
+        await redis.xadd(
+            WEBHOOK_STREAM,
+            {"type": event, "ref": reference},
+            maxlen=WEBHOOK_STREAM_MAXLEN,
+            approximate=True
+        )
+        return True
+    except Exception as e:
+        logger.error("Failed to queue webhook event %s for %s: %s", event, reference, e)
+        return False
+
+
+def _parse_entry(fields: Dict[bytes, bytes]) -> Optional[Tuple[str, str]]:
+    """Extract (event, reference) from a stream entry, or None if it is malformed."""
+    try:
+        return fields[b"type"].decode(), fields[b"ref"].decode()
+    except (KeyError, AttributeError, UnicodeDecodeError):
+        return None
+
+
+async def _process_event(semaphore: asyncio.Semaphore, event: str, reference: str) -> bool:
+    """Process one queued event in its own session. Returns True if it can be acked."""
+    handler = WEBHOOK_HANDLERS.get(event)
+    if handler is None:
+        logger.warning("Dropping unknown webhook event %s for %s", event, reference)
+        return True
+    
+    async with semaphore:
+        try:
+            async with AsyncSessionLocal() as db:
+                result = await handler(db=db, reference=reference)
+            logger.info("Queued webhook processed: %s %s - %s", event, reference, result.get("message"))
+            return True
+        except Exception:
+            # Left pending; the reclaim sweep retries it once it has been idle
+            # for WEBHOOK_RECLAIM_IDLE_MS
+            logger.error("Queued webhook failed: %s %s", event, reference, exc_info=True)
+            return False
+
+
+async def _handle_entries(
+    redis: Redis,
+    semaphore: asyncio.Semaphore,
+    entries: List[Entry],
+    deliveries: Optional[Dict[bytes, int]] = None
+):
+    """
+    Process a batch of stream entries, then ack and dead-letter in one round trip.
+    
+    Args:
+        deliveries: Delivery count per entry id for reclaimed entries; entries
+            missing from it are on their first delivery
+    """
+    deliveries = deliveries or {}
+    done: List[bytes] = []
+    dead: List[Tuple[bytes, Dict[bytes, bytes], str]] = []
+    work: List[Tuple[bytes, str, str]] = []
+    
+    for entry_id, fields in entries:
+        if fields is None:
+            # Trimmed from the stream while pending; nothing left to process
+            done.append(entry_id)
+        elif (parsed := _parse_entry(fields)) is None:
+            dead.append((entry_id, fields, "malformed entry"))
+        elif deliveries.get(entry_id, 1) > WEBHOOK_MAX_DELIVERIES:
+            dead.append((entry_id, fields, f"failed {WEBHOOK_MAX_DELIVERIES} deliveries"))
+        else:
+            work.append((entry_id, *parsed))
+    
+    results = await asyncio.gather(*(
+        _process_event(semaphore, event, reference) for _, event, reference in work
+    ))
+    done.extend(entry_id for (entry_id, _, _), ok in zip(work, results) if ok)
+    
+    if not done and not dead:
+        return
+    
+    async with redis.pipeline(transaction=True) as pipe:
+        for entry_id, fields, reason in dead:
+            logger.error("Dead-lettering webhook entry %s (%s): %s", entry_id.decode(), reason, fields)
+            pipe.xadd(
+                WEBHOOK_DEAD_LETTER_STREAM,
+                {**fields, b"id": entry_id, b"reason": reason},
+                maxlen=WEBHOOK_STREAM_MAXLEN,
+                approximate=True
+            )
+        pipe.xack(WEBHOOK_STREAM, WEBHOOK_GROUP, *done, *(entry_id for entry_id, _, _ in dead))
+        await pipe.execute()
+
+
+async def _read_new(redis: Redis, semaphore: asyncio.Semaphore):
+    """Read and process one batch of events never delivered to any consumer."""
+    response = await redis.xreadgroup(
+        WEBHOOK_GROUP,
+        _consumer_name,
+        {WEBHOOK_STREAM: ">"},
+        count=WEBHOOK_BATCH_SIZE,
+        block=5000
+    )
+    if response:
+        await _handle_entries(redis, semaphore, response[0][1])
+
+
+async def _reclaim(redis: Redis, semaphore: asyncio.Semaphore):
+    """Claim entries left pending by any consumer, including stale ones, and retry them."""
+    cursor = "0-0"
+    
+    while True:
+        response = await redis.xautoclaim(
+            WEBHOOK_STREAM,
+            WEBHOOK_GROUP,
+            _consumer_name,
+            WEBHOOK_RECLAIM_IDLE_MS,
+            start_id=cursor,
+            count=WEBHOOK_BATCH_SIZE
+        )
+        cursor, entries = response[0], response[1]
+        
+        if entries:
+            # XAUTOCLAIM bumps the delivery counter but does not return it
+            async with redis.pipeline(transaction=False) as pipe:
+                for entry_id, _ in entries:
+                    pipe.xpending_range(WEBHOOK_STREAM, WEBHOOK_GROUP, entry_id, entry_id, 1)
+                pending = await pipe.execute()
+            deliveries = {p[0]["message_id"]: p[0]["times_delivered"] for p in pending if p}
+            
+            await _handle_entries(redis, semaphore, entries, deliveries)
+        
+        if cursor in (b"0-0", "0-0"):
+            return
+
+
+async def _consume():
+    """Read charge events from the stream and process them until cancelled."""
+    redis = get_redis()
+    semaphore = asyncio.Semaphore(WEBHOOK_CONCURRENCY)
+    loop = asyncio.get_running_loop()
+    
+    while True:
+        try:
+            await redis.xgroup_create(WEBHOOK_STREAM, WEBHOOK_GROUP, id="0", mkstream=True)
+            break
+        except ResponseError as e:
+            if "BUSYGROUP" in str(e):
+                break
+            logger.error("Failed to create webhook consumer group: %s", e)
+        except Exception as e:
+            logger.error("Failed to create webhook consumer group: %s", e)
+        await asyncio.sleep(1)
+    
+    # Sweep first so entries abandoned before a restart or redeploy are retried
+    next_reclaim = loop.time()
+    
+    while True:
+        try:
+            if loop.time() >= next_reclaim:
+                await _reclaim(redis, semaphore)
+                next_reclaim = loop.time() + WEBHOOK_RECLAIM_INTERVAL
+            
+            await _read_new(redis, semaphore)
+        except asyncio.CancelledError:
+            raise
+        except Exception as e:
+            logger.error("Webhook worker iteration failed: %s", e)
+            await asyncio.sleep(1)
+
+
+async def start_webhook_worker():
+    """Start the background webhook worker if Redis is available."""
+    global _worker_task
+    
+    try:
+        get_redis()
+    except RuntimeError:
+        logger.warning("Redis unavailable, webhooks will be processed inline")
+        return
+    
+    if _worker_task is None:
+        _worker_task = asyncio.create_task(_consume())
+        logger.info("Webhook worker started as consumer %s", _consumer_name)
+
+
+async def stop_webhook_worker():
+    """Stop the background webhook worker; unacked entries are reclaimed later."""
+    global _worker_task
+    if _worker_task:
+        _worker_task.cancel()
+        try:
+            await _worker_task
+        except (asyncio.CancelledError, Exception):
+            pass
+        _worker_task = None
+        logger.info("Webhook worker stopped")
@@ -1,65 +1,241 @@
+import ipaddress
+import math
+import secrets
+import time
+from collections import OrderedDict
 from datetime import timedelta
-from functools import wraps
-from fastapi import HTTPException, Request, status
-from app.core.redis import get_redis
+from functools import lru_cache, wraps
+from typing import Dict, Optional, Tuple
+from fastapi import HTTPException, Request, Response, status
+from redis.asyncio import Redis
+from redis.exceptions import NoScriptError
+from app.config import settings
+from app.core.redis import get_redis, init_redis
 from app.utils.logger import logger
 
+# Sliding window log in one atomic round trip: drop entries older than the window,
+# admit and record the request if under the limit, and report how long until the
+# oldest entry leaves the window (when a slot frees up). Returns {allowed, count, reset_ms}.
+RATE_LIMIT_LUA = """
+local now = tonumber(ARGV[1])
+local window = tonumber(ARGV[2])
+local limit = tonumber(ARGV[3])
+redis.call('ZREMRANGEBYSCORE', KEYS[1], '-inf', now - window)
+local c = redis.call('ZCARD', KEYS[1])
+local allowed = 0
+if c < limit then
+    redis.call('ZADD', KEYS[1], now, ARGV[4])
+    redis.call('PEXPIRE', KEYS[1], window + 10000)
+    allowed = 1
+    c = c + 1
+end
+local oldest = redis.call('ZRANGE', KEYS[1], 0, 0, 'WITHSCORES')
+return {allowed, c, tonumber(oldest[2]) + window - now}
+"""
 
-async def check_rate_limit(key: str, max_requests: int, window: timedelta) -> bool:
+# Trusted callers that skip rate limiting, parsed once from RATE_LIMIT_EXEMPT_IPS
+_EXEMPT_ENTRIES = [entry.strip() for entry in settings.RATE_LIMIT_EXEMPT_IPS.split(",") if entry.strip()]
+EXEMPT_IPS = frozenset(entry for entry in _EXEMPT_ENTRIES if "/" not in entry)
+EXEMPT_NETWORKS = tuple(ipaddress.ip_network(entry, strict=False) for entry in _EXEMPT_ENTRIES if "/" in entry)
+
+
+@lru_cache(maxsize=4096)
+def _in_exempt_network(client_ip: str) -> bool:
+    """Check if an address falls in one of the exempt CIDR ranges."""
+    try:
+        address = ipaddress.ip_address(client_ip)
+    except ValueError:
+        return False
+    return any(address in network for network in EXEMPT_NETWORKS)
+
+
+def is_exempt(client_ip: str) -> bool:
+    """Check if a client IP bypasses rate limiting."""
+    return client_ip in EXEMPT_IPS or (bool(EXEMPT_NETWORKS) and _in_exempt_network(client_ip))
+
+
+# Resolved once by init_rate_limiter() at startup, so the hot path is a single EVALSHA
+_redis: Optional[Redis] = None
+_rl_sha: Optional[str] = None
+
+# After a Redis failure, requests use the local limiter until this monotonic ms and
+# Redis is retried at most once per interval, so an outage costs neither a connect
+# timeout nor an ERROR line per request
+_REDIS_RETRY_MS = 30_000
+_redis_retry_at = 0.0
+
+
+# Per-process fixed-window fallback used while Redis is unreachable:
+# key -> (count, window start in monotonic ms). Bounded LRU; no lock is needed as
+# it is only touched from the event loop without awaiting.
+_LOCAL_MAX_KEYS = 10_000
+_local_buckets: "OrderedDict[bytes, Tuple[int, float]]" = OrderedDict()
+
+# Keys Redis has denied, with the monotonic ms at which the oldest entry leaves the
+# window. Denied requests are not recorded, so every request before that instant
+# is denied too and can be answered without a round trip.
+_denied_until: "OrderedDict[bytes, float]" = OrderedDict()
+
+
+def _rate_limit_headers(max_requests: int, count: int, reset_ms: float) -> Dict[str, str]:
+    """Build X-RateLimit-* headers; Reset is in seconds until a slot frees up."""
+    return {
+        "X-RateLimit-Limit": str(max_requests),
+        "X-RateLimit-Remaining": str(max(max_requests - count, 0)),
+        "X-RateLimit-Reset": str(max(math.ceil(reset_ms / 1000), 1)),
+    }
+
+
+def _raise_rate_limited(max_requests: int, retry_ms: float) -> None:
+    """Raise the 429 response for a denied request."""
+    headers = _rate_limit_headers(max_requests, max_requests, retry_ms)
+    retry_after = headers["X-RateLimit-Reset"]
+    raise HTTPException(
+        status_code=status.HTTP_429_TOO_MANY_REQUESTS,
+        detail=f"Rate limit exceeded. Try again in {retry_after} seconds.",
+        headers={"Retry-After": retry_after, **headers}
+    )
+
+
+def _check_local_rate_limit(key: bytes, max_requests: int, window_ms: int) -> Dict[str, str]:
+    """Apply the limit in process memory; used when Redis is unavailable."""
+    now = time.monotonic() * 1000
+    count, window_start = _local_buckets.get(key, (0, now))
+    
+    if now - window_start >= window_ms:
+        count, window_start = 0, now
+    
+    count += 1
+    _local_buckets[key] = (count, window_start)
+    _local_buckets.move_to_end(key)
+    if len(_local_buckets) > _LOCAL_MAX_KEYS:
+        _local_buckets.popitem(last=False)
+    
+    if count > max_requests:
+        logger.warning("Local rate limit exceeded for %s: %s/%s", key.decode(), count, max_requests)
+        _raise_rate_limited(max_requests, window_start + window_ms - now)
+    
+    return _rate_limit_headers(max_requests, count, window_start + window_ms - now)
+
+
+async def init_rate_limiter(reconnect: bool = False):
+    """Cache the Redis client and preload the rate limit script."""
+    global _redis, _rl_sha, _redis_retry_at
+    
+    if not settings.REDIS_ENABLED:
+        # init_redis() already warned; check_rate_limit() goes straight to the local limiter
+        return
+    
+    try:
+        try:
+            _redis = get_redis()
+        except RuntimeError:
+            if not reconnect:
+                raise
+            # Redis was unreachable at startup; connect now that it may be back
+            await init_redis()
+            _redis = get_redis()
+        _rl_sha = await _redis.script_load(RATE_LIMIT_LUA)
+        logger.info("Rate limiter script loaded")
+    except Exception as e:
+        logger.error(
+            "Failed to load rate limiter script, using local limiter for %ss: %s",
+            _REDIS_RETRY_MS // 1000, e
+        )
+        _redis = None
+        _rl_sha = None
+        _redis_retry_at = time.monotonic() * 1000 + _REDIS_RETRY_MS
+
+
+async def check_rate_limit(key: bytes, max_requests: int, window_ms: int) -> Dict[str, str]:
     """
-    Check if request is within rate limit using Fixed Window algorithm.
+    Check if request is within rate limit using Sliding Window algorithm.
     
-    Returns True if allowed, raises HTTPException if exceeded or Redis unavailable.
+    Returns the X-RateLimit-* headers if allowed, raises HTTPException if exceeded.
+    Falls back to a per-process limit if Redis is disabled or unavailable.
     """
+    global _redis_retry_at
+    
+    if (denied_until := _denied_until.get(key)) is not None:
+        remaining_ms = denied_until - time.monotonic() * 1000
+        if remaining_ms > 0:
+            _raise_rate_limited(max_requests, remaining_ms)
+        del _denied_until[key]
+    
+    if not settings.REDIS_ENABLED or time.monotonic() * 1000 < _redis_retry_at:
+        return _check_local_rate_limit(key, max_requests, window_ms)
+    
     try:
-        redis = get_redis()
+        if _rl_sha is None:
+            # Not initialized at startup (Redis was down, or in tests); failures
+            # are logged there and start the retry interval
+            await init_rate_limiter(reconnect=True)
+            if _rl_sha is None:
+                return _check_local_rate_limit(key, max_requests, window_ms)
         
-        current = await redis.incr(key)
+        now_ms = time.time_ns() // 1_000_000
+        # Members must be unique so requests in the same millisecond are all counted;
+        # kept as 12 raw bytes since the score already carries the timestamp
+        member = now_ms.to_bytes(8, "big") + secrets.token_bytes(4)
+        args = (now_ms, window_ms, max_requests, member)
         
-        if current == 1:
-            await redis.expire(key, int(window.total_seconds()))
+        try:
+            allowed, current, reset_ms = await _redis.evalsha(_rl_sha, 1, key, *args)
+        except NoScriptError:
+            # Script cache was flushed (e.g. Redis restart); EVAL reloads it
+            allowed, current, reset_ms = await _redis.eval(RATE_LIMIT_LUA, 1, key, *args)
         
-        if current > max_requests:
-            ttl = await redis.ttl(key)
-            logger.warning(f"Rate limit exceeded for {key}: {current}/{max_requests}")
-            raise HTTPException(
-                status_code=status.HTTP_429_TOO_MANY_REQUESTS,
-                detail=f"Rate limit exceeded. Try again in {ttl} seconds.",
-                headers={"Retry-After": str(ttl), "X-RateLimit-Remaining": "0"}
-            )
+        if not allowed:
+            logger.warning("Rate limit exceeded for %s: %s/%s", key.decode(), current, max_requests)
+            _denied_until[key] = time.monotonic() * 1000 + reset_ms
+            if len(_denied_until) > _LOCAL_MAX_KEYS:
+                _denied_until.popitem(last=False)
+            _raise_rate_limited(max_requests, reset_ms)
         
-        return True
+        return _rate_limit_headers(max_requests, current, reset_ms)
     except HTTPException:
         raise
     except Exception as e:
-        logger.error(f"Rate limit check failed: {e}")
-        # Fail-closed: block request if Redis is down
-        raise HTTPException(
-            status_code=status.HTTP_503_SERVICE_UNAVAILABLE,
-            detail="Service is temporarily unavailable, please try again later."
-        )
+        logger.error("Rate limit check failed, using local limiter for %ss: %s", _REDIS_RETRY_MS // 1000, e)
+        _redis_retry_at = time.monotonic() * 1000 + _REDIS_RETRY_MS
+        # Fail-open to a per-process limit so a Redis outage does not take the API down
+        return _check_local_rate_limit(key, max_requests, window_ms)
 
 
 def rate_limit(max_requests: int, window: timedelta):
     """
-    Decorator for rate limiting endpoints using Fixed Window algorithm.
+    Decorator for rate limiting endpoints using Sliding Window algorithm.
     
     Usage:
         @rate_limit(max_requests=5, window=timedelta(minutes=1))
         async def endpoint(request: Request, ...):
             ...
     """
+    # Per-endpoint constants, computed once when the route is decorated
+    window_ms = int(window.total_seconds() * 1000)
+    
     def decorator(func):
+        # One short key per (endpoint, IP): named after the handler rather than the
+        # request path, so path parameters cannot multiply keys
+        key_prefix = ("rl:" + func.__module__.rsplit(".", 1)[-1] + "." + func.__name__ + ":").encode()
+        
         @wraps(func)
         async def wrapper(*args, request: Request, **kwargs):
             client_ip = request.client.host if request.client else "unknown"
             
-            endpoint = f"{request.method}:{request.url.path}"
-            key = f"rate_limit:{client_ip}:{endpoint}"
+            if is_exempt(client_ip):
+                return await func(*args, request=request, **kwargs)
+            
+            key = key_prefix + client_ip.encode("ascii")
             
-            await check_rate_limit(key, max_requests, window)
+            headers = await check_rate_limit(key, max_requests, window_ms)
             
-            return await func(*args, request=request, **kwargs)
+            response = await func(*args, request=request, **kwargs)
+            # Handlers here return Response objects; anything else is serialized later
+            # by FastAPI and goes out without the headers
+            if isinstance(response, Response):
+                response.headers.update(headers)
+            return response
         
         return wrapper
     return decorator
@@ -1,7 +1,9 @@
-from typing import Optional
+from decimal import Decimal
+from typing import Any, Optional
 
+import orjson
 from fastapi.encoders import jsonable_encoder
-from fastapi.responses import JSONResponse
+from fastapi.responses import JSONResponse, Response
 
 
 def success_response(status_code: int, message: str, data: Optional[dict] = None):
@@ -19,6 +21,32 @@ def success_response(status_code: int, message: str, data: Optional[dict] = None
     )
 
 
+def _json_default(obj: Any):
+    """Encode types orjson does not handle natively"""
+    if isinstance(obj, Decimal):
+        return str(obj)
+    raise TypeError(f"Object of type {type(obj).__name__} is not JSON serializable")
+
+
+def dump_json(data: Any) -> bytes:
+    """Serialize plain data (e.g. database row mappings) straight to JSON bytes"""
+    return orjson.dumps(data, default=_json_default)
+
+
+def encoded_success_response(status_code: int, message: str, data: bytes):
+    """Returns a success response around an already JSON-encoded data payload"""
+
+    content = b'{"status":"success","status_code":%d,"message":%s,"data":%s}' % (
+        status_code,
+        orjson.dumps(message),
+        data,
+    )
+
+    return Response(
+        status_code=status_code, content=content, media_type="application/json"
+    )
+
+
 def auth_response(
     status_code: int,
     message: str,
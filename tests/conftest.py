@@ -0,0 +1,36 @@
+import fakeredis
+import pytest_asyncio
+from sqlalchemy.ext.asyncio import AsyncSession, async_sessionmaker, create_async_engine
+from sqlalchemy.pool import StaticPool
+
+import app.models  # noqa: F401  registers every table on Base.metadata
+from app.db.base import Base
+
+
+@pytest_asyncio.fixture
+async def session_factory():
+    """Session factory bound to a fresh in-memory SQLite database."""
+    engine = create_async_engine(
+        "sqlite+aiosqlite:///:memory:",
+        connect_args={"check_same_thread": False},
+        poolclass=StaticPool,
+    )
+    async with engine.begin() as conn:
+        await conn.run_sync(Base.metadata.create_all)
+    yield async_sessionmaker(engine, class_=AsyncSession, expire_on_commit=False)
+    await engine.dispose()
+
+
+@pytest_asyncio.fixture
+async def db(session_factory):
+    """Database session for a single test."""
+    async with session_factory() as session:
+        yield session
+
+
+@pytest_asyncio.fixture
+async def redis_client():
+    """In-memory Redis with Lua scripting, matching the app's raw-bytes client."""
+    client = fakeredis.FakeAsyncRedis(decode_responses=False)
+    yield client
+    await client.aclose()
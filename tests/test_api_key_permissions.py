@@ -0,0 +1,15 @@
+from app.models.api_key import APIKey, encode_permissions, decode_permissions
+
+
+def test_permissions_round_trip():
+    """Verify permission names survive packing into a bitmask and back."""
+    bits = encode_permissions(["transfer", "read"])
+    assert decode_permissions(bits) == ("read", "transfer")
+
+
+def test_has_permission_checks_single_bit():
+    """Verify API keys only grant the permissions encoded in their bitmask."""
+    api_key = APIKey(permissions_bits=encode_permissions(["deposit"]))
+    assert api_key.has_permission("deposit")
+    assert not api_key.has_permission("transfer")
+    assert api_key.permissions == ("deposit",)
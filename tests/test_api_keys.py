@@ -0,0 +1,111 @@
+import uuid
+from datetime import datetime, timezone
+
+import pytest
+
+from app.models import APIKey, User, encode_permissions
+from app.services.api_key import (
+    _validated_keys,
+    extract_key_prefix,
+    generate_api_key,
+    list_user_api_keys,
+    revoke_api_key,
+    validate_api_key,
+)
+from app.services.auth import hash_token
+
+
+async def _create_keys(db, count, created_at):
+    user = User(email="keys@example.com", google_id="g-keys", name="Keys")
+    db.add(user)
+    await db.flush()
+    for i in range(count):
+        db.add(APIKey(
+            user_id=user.id,
+            key_prefix=bytes(6),
+            key_hash=f"hash-{i}",
+            name=f"key-{i}",
+            permissions_bits=1,
+            expires_at=datetime(2100, 1, 1),
+            created_at=created_at,
+        ))
+    await db.commit()
+    return user
+
+
+@pytest.mark.asyncio
+async def test_list_api_keys_pages_through_shared_timestamps(db):
+    """Verify keyset pagination returns every key when created_at values collide."""
+    created_at = datetime(2026, 1, 1, tzinfo=timezone.utc)
+    user = await _create_keys(db, 5, created_at)
+
+    seen = []
+    after = after_id = None
+    while True:
+        rows = await list_user_api_keys(
+            db, user.id, limit=2, after=after, after_id=after_id
+        )
+        if not rows:
+            break
+        seen.extend(row.id for row in rows)
+        after, after_id = rows[-1].created_at, rows[-1].id
+
+    assert len(seen) == 5
+    assert len(set(seen)) == 5
+    assert seen == sorted(seen, key=lambda key_id: key_id.hex, reverse=True)
+    assert all(isinstance(key_id, uuid.UUID) for key_id in seen)
+
+
+@pytest.fixture(autouse=True)
+def clear_validated_keys():
+    _validated_keys.clear()
+    yield
+    _validated_keys.clear()
+
+
+async def _create_live_key(db):
+    user = User(email="live@example.com", google_id="g-live", name="Live")
+    db.add(user)
+    await db.flush()
+    plain_key = generate_api_key()
+    api_key = APIKey(
+        user_id=user.id,
+        key_prefix=extract_key_prefix(plain_key),
+        key_hash=hash_token(plain_key),
+        name="live",
+        permissions_bits=encode_permissions(["read", "deposit"]),
+        expires_at=datetime(2100, 1, 1),
+    )
+    db.add(api_key)
+    await db.commit()
+    return user, api_key, plain_key
+
+
+@pytest.mark.asyncio
+async def test_cached_api_key_survives_rollback(db):
+    """Verify a rollback in the authenticating request does not break the cached key."""
+    user, _, plain_key = await _create_live_key(db)
+    user_id = user.id
+
+    validated = await validate_api_key(db, plain_key)
+    # e.g. a failed deposit rolling back the request's session
+    await db.rollback()
+    cached = await validate_api_key(db, plain_key)
+
+    assert cached is validated
+    assert cached.user_id == user_id
+    assert cached.has_permission("deposit")
+    assert not cached.has_permission("transfer")
+
+
+@pytest.mark.asyncio
+async def test_revoke_evicts_cached_api_key(db):
+    """Verify a revoked key stops validating in the same process immediately."""
+    user, api_key, plain_key = await _create_live_key(db)
+    user_id, key_id = user.id, api_key.id
+    await validate_api_key(db, plain_key)
+    await db.rollback()
+
+    await revoke_api_key(db, user_id, key_id)
+
+    assert await validate_api_key(db, plain_key) is None
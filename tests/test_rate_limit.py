@@ -0,0 +1,198 @@
+import logging
+
+import fakeredis
+import pytest
+import pytest_asyncio
+from fastapi import HTTPException
+
+from app.config import settings
+from app.utils import rate_limit
+
+
+@pytest.fixture(autouse=True)
+def reset_rate_limiter(monkeypatch):
+    """Give each test a cold limiter: no Redis client, script, retry deadline or buckets."""
+    monkeypatch.setattr(rate_limit, "_redis", None)
+    monkeypatch.setattr(rate_limit, "_rl_sha", None)
+    monkeypatch.setattr(rate_limit, "_redis_retry_at", 0.0)
+    rate_limit._local_buckets.clear()
+    rate_limit._denied_until.clear()
+    yield
+    rate_limit._local_buckets.clear()
+    rate_limit._denied_until.clear()
+
+
+@pytest.mark.asyncio
+async def test_disabled_redis_uses_local_limiter_without_init(monkeypatch, caplog):
+    """Verify REDIS_ENABLED=False never touches Redis or logs errors."""
+    monkeypatch.setattr(settings, "REDIS_ENABLED", False)
+
+    async def fail_init(*args, **kwargs):
+        raise AssertionError("init_rate_limiter should not run")
+
+    monkeypatch.setattr(rate_limit, "init_rate_limiter", fail_init)
+
+    with caplog.at_level(logging.ERROR):
+        for _ in range(3):
+            headers = await rate_limit.check_rate_limit(b"rl:test:1.2.3.4", 5, 60_000)
+
+    assert headers["X-RateLimit-Remaining"] == "2"
+    assert not [record for record in caplog.records if record.levelno >= logging.ERROR]
+
+
+@pytest.mark.asyncio
+async def test_unavailable_redis_is_retried_once_per_interval(monkeypatch, caplog):
+    """Verify a Redis outage costs one reconnect attempt and one ERROR line per interval."""
+    monkeypatch.setattr(settings, "REDIS_ENABLED", True)
+    attempts = []
+
+    async def unavailable_redis():
+        attempts.append(1)
+
+    def get_redis():
+        raise RuntimeError("Redis not initialized")
+
+    monkeypatch.setattr(rate_limit, "init_redis", unavailable_redis)
+    monkeypatch.setattr(rate_limit, "get_redis", get_redis)
+
+    with caplog.at_level(logging.ERROR):
+        for _ in range(5):
+            await rate_limit.check_rate_limit(b"rl:test:1.2.3.4", 10, 60_000)
+
+    assert len(attempts) == 1
+    assert len([record for record in caplog.records if record.levelno >= logging.ERROR]) == 1
+
+    # Once the interval has passed the next request tries Redis again
+    monkeypatch.setattr(rate_limit, "_redis_retry_at", 0.0)
+    await rate_limit.check_rate_limit(b"rl:test:1.2.3.4", 10, 60_000)
+    assert len(attempts) == 2
+
+
+class FakeClock:
+    """Stands in for the time module so wall and monotonic time move together."""
+
+    def __init__(self):
+        self.ms = 1_000_000
+
+    def time_ns(self):
+        return self.ms * 1_000_000
+
+    def monotonic(self):
+        return self.ms / 1000
+
+
+@pytest.fixture
+def clock(monkeypatch):
+    fake = FakeClock()
+    monkeypatch.setattr(rate_limit, "time", fake)
+    return fake
+
+
+@pytest_asyncio.fixture
+async def redis_limiter(monkeypatch, redis_client):
+    """Limiter initialized against fakeredis, as init_rate_limiter() does at startup."""
+    monkeypatch.setattr(settings, "REDIS_ENABLED", True)
+    monkeypatch.setattr(rate_limit, "get_redis", lambda: redis_client)
+    await rate_limit.init_rate_limiter()
+    assert rate_limit._rl_sha is not None
+    return redis_client
+
+
+KEY = b"rl:test.endpoint:1.2.3.4"
+
+
+@pytest.mark.asyncio
+async def test_redis_admits_with_headers(redis_limiter, clock):
+    """Verify admitted requests are recorded in Redis and report the remaining quota."""
+    headers = await rate_limit.check_rate_limit(KEY, 3, 60_000)
+
+    assert headers == {
+        "X-RateLimit-Limit": "3",
+        "X-RateLimit-Remaining": "2",
+        "X-RateLimit-Reset": "60",
+    }
+    assert await redis_limiter.zcard(KEY) == 1
+
+    clock.ms += 1_500
+    headers = await rate_limit.check_rate_limit(KEY, 3, 60_000)
+    assert headers["X-RateLimit-Remaining"] == "1"
+    # Reset counts down to when the oldest request leaves the window
+    assert headers["X-RateLimit-Reset"] == "59"
+
+
+@pytest.mark.asyncio
+async def test_redis_denies_over_limit(redis_limiter, clock):
+    """Verify the request over the limit gets a 429 with Retry-After and is not recorded."""
+    for _ in range(2):
+        await rate_limit.check_rate_limit(KEY, 2, 60_000)
+        clock.ms += 10_000
+
+    with pytest.raises(HTTPException) as exc_info:
+        await rate_limit.check_rate_limit(KEY, 2, 60_000)
+
+    assert exc_info.value.status_code == 429
+    assert exc_info.value.headers == {
+        "Retry-After": "40",
+        "X-RateLimit-Limit": "2",
+        "X-RateLimit-Remaining": "0",
+        "X-RateLimit-Reset": "40",
+    }
+    assert await redis_limiter.zcard(KEY) == 2
+
+
+@pytest.mark.asyncio
+async def test_redis_window_slides(redis_limiter, clock):
+    """Verify a slot frees up as soon as the oldest request leaves the window."""
+    await rate_limit.check_rate_limit(KEY, 2, 1_000)
+    clock.ms += 500
+    await rate_limit.check_rate_limit(KEY, 2, 1_000)
+
+    clock.ms += 400
+    with pytest.raises(HTTPException):
+        await rate_limit.check_rate_limit(KEY, 2, 1_000)
+
+    # The first request (t=0) has left the window; the second (t=500) has not
+    clock.ms += 101
+    headers = await rate_limit.check_rate_limit(KEY, 2, 1_000)
+    assert headers["X-RateLimit-Remaining"] == "0"
+
+    clock.ms += 200
+    with pytest.raises(HTTPException) as exc_info:
+        await rate_limit.check_rate_limit(KEY, 2, 1_000)
+    assert exc_info.value.headers["Retry-After"] == "1"
+
+
+@pytest.mark.asyncio
+async def test_redis_reloads_flushed_script(redis_limiter, clock):
+    """Verify a NOSCRIPT error after a script flush falls back to EVAL."""
+    await rate_limit.check_rate_limit(KEY, 3, 60_000)
+    await redis_limiter.script_flush()
+
+    headers = await rate_limit.check_rate_limit(KEY, 3, 60_000)
+
+    assert headers["X-RateLimit-Remaining"] == "1"
+    assert await redis_limiter.zcard(KEY) == 2
+
+
+@pytest.mark.asyncio
+async def test_redis_failure_falls_back_to_local_limiter(monkeypatch, clock):
+    """Verify requests are limited in process memory while Redis is unreachable."""
+    server = fakeredis.FakeServer()
+    client = fakeredis.FakeAsyncRedis(server=server)
+    monkeypatch.setattr(settings, "REDIS_ENABLED", True)
+    monkeypatch.setattr(rate_limit, "get_redis", lambda: client)
+    await rate_limit.init_rate_limiter()
+    server.connected = False
+
+    headers = await rate_limit.check_rate_limit(KEY, 2, 60_000)
+    assert headers == {
+        "X-RateLimit-Limit": "2",
+        "X-RateLimit-Remaining": "1",
+        "X-RateLimit-Reset": "60",
+    }
+    assert rate_limit._redis_retry_at > clock.ms
+    await rate_limit.check_rate_limit(KEY, 2, 60_000)
+    with pytest.raises(HTTPException) as exc_info:
+        await rate_limit.check_rate_limit(KEY, 2, 60_000)
+    assert exc_info.value.status_code == 429
+    assert exc_info.value.headers["X-RateLimit-Remaining"] == "0"
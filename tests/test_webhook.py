@@ -0,0 +1,139 @@
+from decimal import Decimal
+
+import pytest
+from sqlalchemy import select
+
+from app.models import Transaction, TransactionStatus, TransactionType, User, Wallet
+from app.services.webhook import process_failed_charge, process_successful_charge
+
+
+async def _create_deposit(session_factory, status=TransactionStatus.PENDING, amount="100.00"):
+    async with session_factory() as db:
+        user = User(email="payer@example.com", google_id="g-payer", name="Payer")
+        db.add(user)
+        await db.flush()
+        wallet = Wallet(user_id=user.id, wallet_number="1234567890123", balance=Decimal("0.00"))
+        db.add(wallet)
+        await db.flush()
+        db.add(Transaction(
+            wallet_id=wallet.id,
+            type=TransactionType.DEPOSIT,
+            amount=Decimal(amount),
+            reference="ref-1",
+            status=status,
+        ))
+        await db.commit()
+
+
+async def _state(session_factory):
+    async with session_factory() as db:
+        balance = await db.scalar(select(Wallet.balance))
+        status = await db.scalar(select(Transaction.status).where(Transaction.reference == "ref-1"))
+        return balance, status
+
+
+@pytest.mark.asyncio
+async def test_successful_charge_credits_wallet(session_factory):
+    """Verify the first charge.success credits the wallet and marks the deposit successful."""
+    await _create_deposit(session_factory)
+
+    async with session_factory() as db:
+        result = await process_successful_charge(db, "ref-1")
+
+    assert result == {"status": True, "message": "Wallet credited successfully"}
+    assert await _state(session_factory) == (Decimal("100.00"), TransactionStatus.SUCCESS)
+
+
+@pytest.mark.asyncio
+async def test_duplicate_successful_charge_credits_once(session_factory):
+    """Verify a redelivered charge.success does not credit the wallet twice."""
+    await _create_deposit(session_factory)
+
+    async with session_factory() as db:
+        await process_successful_charge(db, "ref-1")
+    async with session_factory() as db:
+        result = await process_successful_charge(db, "ref-1")
+
+    assert result == {"status": True, "message": "Transaction already processed"}
+    assert await _state(session_factory) == (Decimal("100.00"), TransactionStatus.SUCCESS)
+
+
+@pytest.mark.asyncio
+async def test_duplicate_successful_charge_on_stale_session_credits_once(session_factory):
+    """Verify the conditional update guards a session still holding the pending transaction."""
+    await _create_deposit(session_factory)
+
+    async with session_factory() as db:
+        await process_successful_charge(db, "ref-1")
+        # The identity map still reports the pre-update status, so only the
+        # conditional UPDATE stops the second credit
+        result = await process_successful_charge(db, "ref-1")
+
+    assert result == {"status": True, "message": "Transaction already processed"}
+    assert await _state(session_factory) == (Decimal("100.00"), TransactionStatus.SUCCESS)
+
+
+@pytest.mark.asyncio
+async def test_successful_charge_after_failure_credits_wallet(session_factory):
+    """Verify a charge.success arriving after charge.failed still credits the wallet."""
+    await _create_deposit(session_factory, status=TransactionStatus.FAILED)
+
+    async with session_factory() as db:
+        result = await process_successful_charge(db, "ref-1")
+
+    assert result == {"status": True, "message": "Wallet credited successfully"}
+    assert await _state(session_factory) == (Decimal("100.00"), TransactionStatus.SUCCESS)
+
+
+@pytest.mark.asyncio
+async def test_successful_charge_unknown_reference(session_factory):
+    """Verify charges for references we did not create are acknowledged and ignored."""
+    async with session_factory() as db:
+        result = await process_successful_charge(db, "missing")
+
+    assert result == {"status": True, "message": "Transaction not found"}
+
+
+@pytest.mark.asyncio
+async def test_failed_charge_marks_pending_transaction_failed(session_factory):
+    """Verify charge.failed moves a pending deposit to failed without touching the balance."""
+    await _create_deposit(session_factory)
+
+    async with session_factory() as db:
+        result = await process_failed_charge(db, "ref-1")
+
+    assert result == {"status": True, "message": "Transaction marked as failed"}
+    assert await _state(session_factory) == (Decimal("0.00"), TransactionStatus.FAILED)
+
+
+@pytest.mark.asyncio
+async def test_failed_charge_unknown_reference(session_factory):
+    """Verify charge.failed for an unknown reference is acknowledged."""
+    async with session_factory() as db:
+        result = await process_failed_charge(db, "missing")
+
+    assert result == {"status": True, "message": "Transaction not found"}
+
+
+@pytest.mark.asyncio
+async def test_failed_charge_already_failed(session_factory):
+    """Verify a redelivered charge.failed leaves the transaction failed."""
+    await _create_deposit(session_factory, status=TransactionStatus.FAILED)
+
+    async with session_factory() as db:
+        result = await process_failed_charge(db, "ref-1")
+
+    assert result == {"status": True, "message": "Transaction already marked as failed"}
+    assert await _state(session_factory) == (Decimal("0.00"), TransactionStatus.FAILED)
+
+
+@pytest.mark.asyncio
+async def test_failed_charge_does_not_override_success(session_factory):
+    """Verify charge.failed cannot revert a successful deposit."""
+    await _create_deposit(session_factory, status=TransactionStatus.SUCCESS)
+
+    async with session_factory() as db:
+        result = await process_failed_charge(db, "ref-1")
+
+    assert result == {"status": False, "message": "Transaction already successful"}
+    assert await _state(session_factory) == (Decimal("0.00"), TransactionStatus.SUCCESS)
@@ -0,0 +1,158 @@
+import asyncio
+
+import pytest
+import pytest_asyncio
+
+from app.services import webhook_queue
+from app.services.webhook_queue import (
+    WEBHOOK_DEAD_LETTER_STREAM,
+    WEBHOOK_GROUP,
+    WEBHOOK_MAX_DELIVERIES,
+    WEBHOOK_STREAM,
+)
+
+
+class Handler:
+    """Stand-in charge handler that records references and fails on demand."""
+
+    def __init__(self):
+        self.calls = []
+        self.fail = False
+
+    async def __call__(self, db, reference):
+        self.calls.append(reference)
+        if self.fail:
+            raise RuntimeError("database unavailable")
+        return {"status": True, "message": "ok"}
+
+
+@pytest.fixture
+def handler(monkeypatch):
+    handler = Handler()
+    monkeypatch.setitem(webhook_queue.WEBHOOK_HANDLERS, "charge.success", handler)
+    return handler
+
+
+@pytest_asyncio.fixture
+async def queue(monkeypatch, redis_client, session_factory):
+    """Webhook queue wired to fakeredis with its consumer group created."""
+    monkeypatch.setattr(webhook_queue, "get_redis", lambda: redis_client)
+    monkeypatch.setattr(webhook_queue, "AsyncSessionLocal", session_factory)
+    monkeypatch.setattr(webhook_queue, "_consumer_name", "worker-a")
+    # Stands in for a running worker task so events are queued, not handled inline
+    monkeypatch.setattr(webhook_queue, "_worker_task", asyncio.get_running_loop().create_future())
+    # Treat every pending entry as abandoned so sweeps do not have to wait
+    monkeypatch.setattr(webhook_queue, "WEBHOOK_RECLAIM_IDLE_MS", 0)
+    await redis_client.xgroup_create(WEBHOOK_STREAM, WEBHOOK_GROUP, id="0", mkstream=True)
+    return redis_client
+
+
+async def _pending(redis):
+    return (await redis.xpending(WEBHOOK_STREAM, WEBHOOK_GROUP))["pending"]
+
+
+@pytest.mark.asyncio
+async def test_enqueue_adds_stream_entry(queue):
+    """Verify enqueued events land on the stream with their type and reference."""
+    assert await webhook_queue.enqueue_webhook_event("charge.success", "ref-1")
+
+    entries = await queue.xrange(WEBHOOK_STREAM)
+    assert [fields for _, fields in entries] == [{b"type": b"charge.success", b"ref": b"ref-1"}]
+
+
+@pytest.mark.asyncio
+async def test_enqueue_without_running_worker_falls_back_inline(monkeypatch, queue):
+    """Verify events are not queued when no worker in this process would read them."""
+    # e.g. Redis was down at startup and came back through a later reconnect
+    monkeypatch.setattr(webhook_queue, "_worker_task", None)
+
+    assert not await webhook_queue.enqueue_webhook_event("charge.success", "ref-1")
+    assert await queue.xlen(WEBHOOK_STREAM) == 0
+
+    finished = asyncio.get_running_loop().create_future()
+    finished.set_result(None)
+    monkeypatch.setattr(webhook_queue, "_worker_task", finished)
+
+    assert not await webhook_queue.enqueue_webhook_event("charge.success", "ref-1")
+    assert await queue.xlen(WEBHOOK_STREAM) == 0
+
+
+@pytest.mark.asyncio
+async def test_enqueue_reports_unavailable_redis(monkeypatch, queue):
+    """Verify the caller is told to process inline when Redis is down."""
+    def get_redis():
+        raise RuntimeError("Redis not initialized")
+
+    monkeypatch.setattr(webhook_queue, "get_redis", get_redis)
+
+    assert not await webhook_queue.enqueue_webhook_event("charge.success", "ref-1")
+
+
+@pytest.mark.asyncio
+async def test_processed_event_is_acked(queue, handler):
+    """Verify a successfully handled event is removed from the pending list."""
+    await webhook_queue.enqueue_webhook_event("charge.success", "ref-1")
+
+    await webhook_queue._read_new(queue, asyncio.Semaphore(5))
+
+    assert handler.calls == ["ref-1"]
+    assert await _pending(queue) == 0
+
+
+@pytest.mark.asyncio
+async def test_failed_event_stays_pending(queue, handler):
+    """Verify a handler failure leaves the event pending for a retry."""
+    handler.fail = True
+    await webhook_queue.enqueue_webhook_event("charge.success", "ref-1")
+
+    await webhook_queue._read_new(queue, asyncio.Semaphore(5))
+
+    assert handler.calls == ["ref-1"]
+    assert await _pending(queue) == 1
+
+
+@pytest.mark.asyncio
+async def test_reclaim_retries_entries_from_other_consumers(monkeypatch, queue, handler):
+    """Verify the sweep picks up entries a stale consumer (e.g. before a redeploy) left pending."""
+    handler.fail = True
+    await webhook_queue.enqueue_webhook_event("charge.success", "ref-1")
+    await webhook_queue._read_new(queue, asyncio.Semaphore(5))
+
+    handler.fail = False
+    monkeypatch.setattr(webhook_queue, "_consumer_name", "worker-b")
+    await webhook_queue._reclaim(queue, asyncio.Semaphore(5))
+
+    assert handler.calls == ["ref-1", "ref-1"]
+    assert await _pending(queue) == 0
+
+
+@pytest.mark.asyncio
+async def test_repeatedly_failing_event_is_dead_lettered(queue, handler):
+    """Verify an event is moved to the dead-letter stream after the delivery cap."""
+    handler.fail = True
+    await webhook_queue.enqueue_webhook_event("charge.success", "ref-1")
+    await webhook_queue._read_new(queue, asyncio.Semaphore(5))
+
+    for _ in range(WEBHOOK_MAX_DELIVERIES):
+        await webhook_queue._reclaim(queue, asyncio.Semaphore(5))
+
+    assert len(handler.calls) == WEBHOOK_MAX_DELIVERIES
+    assert await _pending(queue) == 0
+    dead = await queue.xrange(WEBHOOK_DEAD_LETTER_STREAM)
+    assert len(dead) == 1
+    assert dead[0][1][b"ref"] == b"ref-1"
+    assert dead[0][1][b"reason"] == f"failed {WEBHOOK_MAX_DELIVERIES} deliveries".encode()
+
+
+@pytest.mark.asyncio
+async def test_malformed_entry_does_not_fail_batch(queue, handler):
+    """Verify a malformed entry is dead-lettered while the rest of its batch is processed."""
+    await queue.xadd(WEBHOOK_STREAM, {"type": "charge.success"})
+    await webhook_queue.enqueue_webhook_event("charge.success", "ref-1")
+
+    await webhook_queue._read_new(queue, asyncio.Semaphore(5))
+
+    assert handler.calls == ["ref-1"]
+    assert await _pending(queue) == 0
+    dead = await queue.xrange(WEBHOOK_DEAD_LETTER_STREAM)
+    assert [fields[b"reason"] for _, fields in dead] == [b"malformed entry"]